@@ -0,0 +1,62 @@
+# gevent has to patch the stdlib before anything imports ssl/socket.
+# With preload_app the master imports src.main (and with it requests/
+# httpx) before workers fork, so this config module - the first thing
+# gunicorn executes - is the only spot early enough.
+from gevent import monkey
+monkey.patch_all()
+
+import fcntl
+import multiprocessing
+import os
+import tempfile
+
+# Gunicorn configuration for production.
+# Every route in this app is I/O-bound (Supabase HTTP calls, Punting Form
+# API requests), so gevent workers let each worker keep many requests
+# in flight instead of pinning a thread per upstream round trip.
+#
+# Run with: gunicorn -c gunicorn_conf.py src.main:app
+
+bind = "0.0.0.0:5000"
+# Import the app once in the master so workers share it copy-on-write
+preload_app = True
+worker_class = "gevent"
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_connections = 1000
+keepalive = 5
+timeout = 120
+accesslog = "-"
+errorlog = "-"
+
+# Lock file electing the scheduler worker. The kernel releases the
+# lock when its holder exits, so the role survives worker churn.
+_scheduler_lock_path = os.path.join(tempfile.gettempdir(), 'algorate-scheduler.lock')
+
+def post_fork(server, worker):
+    """Start the task scheduler in exactly one worker
+
+    It must not start in the preloaded master: threads don't survive
+    fork, the master would open Supabase TLS connections that forked
+    workers then share, and wake()/submit_task() calls from request
+    handlers need the loop in a worker process.
+
+    Each new worker races for a non-blocking flock on a well-known
+    file; the winner runs the scheduler. When that worker is reaped -
+    crash, OOM kill, timeout, HUP reload - the kernel drops the lock
+    and the replacement worker's own post_fork claims it, so scheduled
+    imports keep running through routine churn (a worker.age check
+    would only ever match the first worker spawned).
+    """
+    lock_file = open(_scheduler_lock_path, 'w')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return
+
+    # Held, not leaked: the fd must stay open for the worker's lifetime
+    # or the lock would release while the scheduler is still running
+    worker._scheduler_lock_file = lock_file
+
+    from src.modules.scheduler.task_scheduler import start_scheduler
+    start_scheduler()
@@ -0,0 +1,70 @@
+-- One-statement bulk upsert for the meetings import. PostgREST's
+-- .upsert() still expands a batch into per-row statements server-side;
+-- this takes the whole batch as jsonb and runs a single INSERT ... ON
+-- CONFLICT, returning the inserted/updated split (xmax = 0 marks rows
+-- created by this statement). Run in the Supabase SQL editor.
+--
+-- Column types mirror the meetings table; adjust if the schema drifts.
+
+create or replace function bulk_upsert_meetings(payload jsonb)
+returns table(inserted bigint, updated bigint)
+language sql
+as $$
+  with up as (
+    insert into meetings (
+      pf_meeting_id, track_name, track_id, track_state, track_country,
+      track_location, track_abbreviation, meeting_date, stage, tab_meeting,
+      rail_position, expected_condition, is_barrier_trial, is_jumps,
+      has_sectionals, form_updated, results_updated, sectionals_updated,
+      ratings_updated, status, is_test_data, content_hash, updated_at, created_at
+    )
+    select
+      r.pf_meeting_id, r.track_name, r.track_id, r.track_state, r.track_country,
+      r.track_location, r.track_abbreviation, r.meeting_date, r.stage, r.tab_meeting,
+      r.rail_position, r.expected_condition, r.is_barrier_trial, r.is_jumps,
+      r.has_sectionals, r.form_updated, r.results_updated, r.sectionals_updated,
+      r.ratings_updated, r.status, r.is_test_data, r.content_hash, r.updated_at, r.created_at
+    from jsonb_to_recordset(payload) as r(
+      pf_meeting_id text, track_name text, track_id text, track_state text,
+      track_country text, track_location text, track_abbreviation text,
+      meeting_date date, stage text, tab_meeting boolean,
+      rail_position text, expected_condition text, is_barrier_trial boolean,
+      is_jumps boolean, has_sectionals boolean, form_updated text,
+      results_updated text, sectionals_updated text, ratings_updated text,
+      status text, is_test_data boolean, content_hash text,
+      updated_at timestamptz, created_at timestamptz
+    )
+    on conflict (pf_meeting_id) do update set
+      track_name = excluded.track_name,
+      track_id = excluded.track_id,
+      track_state = excluded.track_state,
+      track_country = excluded.track_country,
+      track_location = excluded.track_location,
+      track_abbreviation = excluded.track_abbreviation,
+      meeting_date = excluded.meeting_date,
+      stage = excluded.stage,
+      tab_meeting = excluded.tab_meeting,
+      rail_position = excluded.rail_position,
+      expected_condition = excluded.expected_condition,
+      is_barrier_trial = excluded.is_barrier_trial,
+      is_jumps = excluded.is_jumps,
+      has_sectionals = excluded.has_sectionals,
+      form_updated = excluded.form_updated,
+      results_updated = excluded.results_updated,
+      sectionals_updated = excluded.sectionals_updated,
+      ratings_updated = excluded.ratings_updated,
+      status = excluded.status,
+      is_test_data = excluded.is_test_data,
+      content_hash = excluded.content_hash,
+      updated_at = excluded.updated_at
+      -- created_at deliberately not updated: existing rows keep theirs.
+      -- Unchanged rows (same content hash) are skipped entirely - no
+      -- WAL write, and they drop out of the inserted/updated counts.
+      where meetings.content_hash is distinct from excluded.content_hash
+    returning (xmax = 0) as was_inserted
+  )
+  select
+    count(*) filter (where was_inserted) as inserted,
+    count(*) filter (where not was_inserted) as updated
+  from up;
+$$;
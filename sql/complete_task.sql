@@ -0,0 +1,24 @@
+-- One-statement task completion for the scheduler. Replaces four
+-- sequential PostgREST calls (two counter-increment RPCs, a SELECT to
+-- recompute the next run, and the final UPDATE) with a single function
+-- call; next_run_at is computed by the caller from the task it already
+-- holds. Run in the Supabase SQL editor.
+
+create or replace function complete_task(
+    p_task_id text,
+    p_status text,
+    p_message text,
+    p_next_run_at timestamptz
+) returns void
+language sql
+as $$
+  update scheduled_tasks set
+    is_running = false,
+    last_run_status = p_status,
+    last_run_message = p_message,
+    total_runs = coalesce(total_runs, 0) + 1,
+    successful_runs = coalesce(successful_runs, 0) + (p_status = 'success')::int,
+    failed_runs = coalesce(failed_runs, 0) + (p_status <> 'success')::int,
+    next_run_at = coalesce(p_next_run_at, next_run_at)
+  where task_id::text = p_task_id;
+$$;
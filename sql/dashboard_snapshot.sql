@@ -0,0 +1,32 @@
+-- One-trip dashboard snapshot: status counts plus the five most recent
+-- imports, built as JSON on the database side. Run in the Supabase SQL
+-- editor. Supersedes calling import_log_status_counts() + a separate
+-- recent-logs query from the app.
+
+create or replace function dashboard_snapshot()
+returns json as $$
+    with s as (
+        select count(*) as total,
+               count(*) filter (where status = 'completed') as completed,
+               count(*) filter (where status = 'failed') as failed
+        from import_logs
+    ),
+    r as (
+        select coalesce(json_agg(x), '[]'::json) as recent
+        from (
+            select id, import_type, trigger_type, import_mode, status,
+                   import_date, started_at, completed_at,
+                   records_processed, records_inserted, records_updated
+            from import_logs
+            order by created_at desc
+            limit 5
+        ) x
+    )
+    select json_build_object(
+        'total', s.total,
+        'completed', s.completed,
+        'failed', s.failed,
+        'recent', r.recent
+    )
+    from s, r;
+$$ language sql stable;
@@ -0,0 +1,13 @@
+-- Aggregated import log status counts for the admin dashboard.
+-- Returns all three counts in one round trip instead of three HEAD
+-- count queries from the app. Run this in the Supabase SQL editor.
+
+create or replace function import_log_status_counts()
+returns json as $$
+    select json_build_object(
+        'total', count(*),
+        'completed', count(*) filter (where status = 'completed'),
+        'failed', count(*) filter (where status = 'failed')
+    )
+    from import_logs;
+$$ language sql stable;
@@ -0,0 +1,10 @@
+-- Indexes backing the dashboard hot paths. Run in the Supabase SQL editor.
+--
+-- * status counts (import_log_status_counts / HEAD count queries) become
+--   index-only scans instead of sequential scans
+-- * recent-activity queries (ORDER BY created_at DESC LIMIT n) become a
+--   backward index scan
+
+create index if not exists ix_import_logs_status on import_logs (status);
+create index if not exists ix_import_logs_created_at on import_logs (created_at desc);
+create index if not exists ix_import_logs_status_created_at on import_logs (status, created_at desc);
@@ -0,0 +1,19 @@
+-- Incremental progress update for import logs. Applies buffered
+-- counter deltas from ImportLogService.update_log_progress as one
+-- atomic UPDATE instead of a round trip per progress report. Run in
+-- the Supabase SQL editor.
+
+create or replace function increment_import_log(
+    p_log_id bigint,
+    p_processed int,
+    p_inserted int,
+    p_updated int
+) returns void
+language sql
+as $$
+  update import_logs set
+    records_processed = coalesce(records_processed, 0) + p_processed,
+    records_inserted = coalesce(records_inserted, 0) + p_inserted,
+    records_updated = coalesce(records_updated, 0) + p_updated
+  where id = p_log_id;
+$$;
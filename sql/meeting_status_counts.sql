@@ -0,0 +1,13 @@
+-- Grouped meeting status counts for the admin UI. One grouped aggregate
+-- replaces three separate HEAD count round trips from the app. Run in
+-- the Supabase SQL editor.
+
+create or replace function meeting_status_counts()
+returns json as $$
+    select json_build_object(
+        'active', count(*) filter (where status = 'active'),
+        'archived', count(*) filter (where status = 'archived'),
+        'total', count(*)
+    )
+    from meetings;
+$$ language sql stable;
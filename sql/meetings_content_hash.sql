@@ -0,0 +1,7 @@
+-- Change-detection hash for the meetings import. The importer stores a
+-- stable hash of each record's content (volatile timestamps excluded)
+-- and skips rewriting rows whose hash is unchanged, so daily re-imports
+-- of a mostly-static card stop generating WAL and replication traffic
+-- for every meeting. Run in the Supabase SQL editor.
+
+alter table meetings add column if not exists content_hash text;
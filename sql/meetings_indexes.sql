@@ -0,0 +1,10 @@
+-- Index backing the status-filtered meeting listings
+-- (WHERE status = ... ORDER BY meeting_date DESC). Run in the Supabase
+-- SQL editor.
+
+create index if not exists ix_meetings_status_meeting_date on meetings (status, meeting_date desc);
+
+-- Partial index for the archive sweep: UPDATE ... WHERE status = 'active'
+-- AND meeting_date < cutoff only ever touches active rows, and the
+-- active partition stays tiny compared to the archive.
+create index if not exists ix_meetings_active_by_date on meetings (meeting_date) where status = 'active';
@@ -0,0 +1,7 @@
+-- Supports the ratings polling candidate query, which filters on
+-- status + meeting_date and then on ratings_updated being null or
+-- stale. Without it the poll scans every recent meeting row. Run in
+-- the Supabase SQL editor.
+
+create index if not exists idx_meetings_status_date_ratings
+    on meetings (status, meeting_date, ratings_updated);
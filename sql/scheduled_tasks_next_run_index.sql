@@ -0,0 +1,8 @@
+-- Supports due-task lookups on the stored next_run_at column, so
+-- finding what should run next is an index scan over active tasks
+-- instead of re-evaluating cron schedules in Python per task. Run in
+-- the Supabase SQL editor.
+
+create index if not exists scheduled_tasks_next_run_at_idx
+    on scheduled_tasks (next_run_at)
+    where is_active;
@@ -0,0 +1,12 @@
+-- Partial indexes backing the scheduler status counts. Active tasks
+-- are a stable set and running tasks are nearly always zero or one
+-- row, so counting either becomes a scan of a tiny index instead of
+-- the whole table. Run in the Supabase SQL editor.
+
+create index if not exists scheduled_tasks_active_idx
+    on scheduled_tasks (task_id)
+    where is_active;
+
+create index if not exists scheduled_tasks_running_idx
+    on scheduled_tasks (task_id)
+    where is_running;
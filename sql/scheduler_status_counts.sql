@@ -0,0 +1,14 @@
+-- One-round-trip counts for the scheduler status endpoint. The two
+-- head-only count queries it replaces each cost a full PostgREST HTTP
+-- call; this returns both numbers in a single row. Run in the Supabase
+-- SQL editor.
+
+create or replace function scheduler_status_counts()
+returns table(active_count bigint, running_count bigint)
+language sql
+as $$
+  select
+    count(*) filter (where is_active) as active_count,
+    count(*) filter (where is_running) as running_count
+  from scheduled_tasks;
+$$;
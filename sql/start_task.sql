@@ -0,0 +1,18 @@
+-- Atomically claims a task for a manual run. The old run-now handler
+-- did SELECT, checked is_running in Python, then UPDATEd - two round
+-- trips with a race window where two clicks could both pass the check.
+-- The conditional UPDATE claims and returns the row in one statement;
+-- an empty result means the task is missing or already running. Run in
+-- the Supabase SQL editor.
+
+create or replace function start_task(p_task_id text)
+returns setof scheduled_tasks
+language sql
+as $$
+  update scheduled_tasks set
+    is_running = true,
+    last_run_at = now()
+  where task_id::text = p_task_id
+    and not is_running
+  returning *;
+$$;
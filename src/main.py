@@ -3,54 +3,110 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask, Response, send_from_directory
 from flask_cors import CORS
-from src.modules.admin.user import user_bp
-from src.modules.admin.dashboard import admin_bp
-from src.modules.imports.meetings.meetings import meetings_bp
-from src.modules.imports.meetings.meeting_status_routes import meeting_status_bp
-from src.modules.imports.meetings.ratings_polling_routes import ratings_polling_bp
-from src.modules.imports.meetings.api_debug import api_debug_bp
-from src.modules.auth.auth import auth_bp
-from src.modules.auth.two_factor import two_factor_bp
-from src.modules.scheduler.scheduler_routes import scheduler_bp
-from src.modules.scheduler.task_scheduler import start_scheduler
-
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'default-secret-key-change-in-production')
-
-# Enable CORS for all routes
-CORS(app)
-
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(admin_bp, url_prefix='/api')
-app.register_blueprint(meetings_bp, url_prefix='/api')
-app.register_blueprint(meeting_status_bp, url_prefix='/api')
-app.register_blueprint(ratings_polling_bp, url_prefix='/api')
-app.register_blueprint(api_debug_bp, url_prefix='/api/debug')
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(two_factor_bp, url_prefix='/api/auth/2fa')
-app.register_blueprint(scheduler_bp, url_prefix='/api')
-
-# Start the task scheduler
-start_scheduler()
-
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
+from src.shared.cache import cache
+from src.shared.json_provider import ORJSONProvider
+from src.shared.query_budget import init_query_budget
+
+
+def create_app():
+    """Application factory
+
+    Blueprint imports happen inside the factory so heavy dependencies
+    (supabase, qrcode, pyotp, requests) load once in the gunicorn master
+    with --preload and are shared copy-on-write across workers, instead
+    of being re-imported eagerly at module import in every process.
+    """
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'default-secret-key-change-in-production')
+
+    # Serialize JSON responses with orjson (C-speed encoding)
+    app.json = ORJSONProvider(app)
+
+    # Enable CORS for all routes
+    CORS(app)
+
+    # Initialize response caching (dashboard stats / system health)
+    cache.init_app(app)
+
+    # Log endpoints that exceed their DB round-trip budget (N+1 canary)
+    init_query_budget(app)
+
+    from src.modules.admin.user import user_bp
+    from src.modules.admin.dashboard import admin_bp
+    from src.modules.imports.meetings.meetings import meetings_bp
+    from src.modules.imports.meetings.meeting_status_routes import meeting_status_bp
+    from src.modules.imports.meetings.ratings_polling_routes import ratings_polling_bp
+    from src.modules.auth.auth import auth_bp
+    from src.modules.auth.two_factor import two_factor_bp
+    from src.modules.scheduler.scheduler_routes import scheduler_bp
+
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api')
+    app.register_blueprint(meetings_bp, url_prefix='/api')
+    app.register_blueprint(meeting_status_bp, url_prefix='/api')
+    app.register_blueprint(ratings_polling_bp, url_prefix='/api')
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(two_factor_bp, url_prefix='/api/auth/2fa')
+    app.register_blueprint(scheduler_bp, url_prefix='/api')
+
+    # Debug-only routes - skip the import entirely unless enabled
+    if os.getenv('ENABLE_API_DEBUG', '').lower() in ('1', 'true', 'yes'):
+        from src.modules.imports.meetings.api_debug import api_debug_bp
+        app.register_blueprint(api_debug_bp, url_prefix='/api/debug')
+
+    # The task scheduler is NOT started here: with --preload this
+    # module imports in the gunicorn master, and a scheduler thread
+    # started pre-fork would die in the workers while its Supabase
+    # connections leak across the fork. Production starts it in a
+    # worker via the post_fork hook in gunicorn_conf.py; the dev
+    # server starts it in the __main__ block below.
+
+    # Only the frontend build's assets/ directory is content-hashed, so
+    # only it gets the year-long cache - and per-response rather than
+    # via SEND_FILE_MAX_AGE_DEFAULT, which would also govern every
+    # send_file call in the app (the 2FA QR stream) and the non-hashed
+    # statics (favicon, logos, a direct /index.html hit). X-Sendfile
+    # hands the actual streaming to the front proxy when one is
+    # configured for it.
+    hashed_asset_max_age = 31536000
+    app.use_x_sendfile = os.getenv('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+
+    # Cache the SPA shell in memory - the fallback branch runs on every
+    # client-side route, and this avoids two stat() calls plus an open()
+    index_path = os.path.join(app.static_folder, 'index.html') if app.static_folder else None
+    index_html = None
+    if index_path and os.path.exists(index_path):
+        with open(index_path, 'rb') as f:
+            index_html = f.read()
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        static_folder_path = app.static_folder
+        if static_folder_path is None:
+                return "Static folder not configured", 404
+
+        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
+            max_age = hashed_asset_max_age if path.startswith('assets/') else None
+            return send_from_directory(static_folder_path, path, max_age=max_age)
+        elif index_html is not None:
+            # The shell itself must stay revalidated so new asset hashes land
+            return Response(index_html, mimetype='text/html',
+                            headers={'Cache-Control': 'no-cache'})
         else:
             return "index.html not found", 404
 
+    return app
+
+
+app = create_app()
+
 
 if __name__ == '__main__':
+    # Dev server only - under gunicorn the scheduler starts in a worker
+    # via the post_fork hook in gunicorn_conf.py
+    from src.modules.scheduler.task_scheduler import start_scheduler
+    start_scheduler()
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -1,23 +1,24 @@
 from flask import Blueprint, jsonify
 from datetime import datetime
-from src.shared.import_log import ImportLogService
+from src.shared.import_log import get_log_service
+from src.shared.cache import cache
 
 admin_bp = Blueprint('admin', __name__)
 
 @admin_bp.route('/dashboard/stats', methods=['GET'])
+@cache.cached(timeout=30)
 def get_dashboard_stats():
     """Get overall dashboard statistics"""
     try:
-        log_service = ImportLogService()
-        
-        # Get import statistics
-        logs = log_service.get_recent_logs(limit=100)  # Get more logs for stats
-        total_imports = len(logs)
-        successful_imports = len([log for log in logs if log.get('status') == 'completed'])
-        failed_imports = len([log for log in logs if log.get('status') == 'failed'])
-        
-        # Get recent activity (last 5)
-        recent_imports = logs[:5]
+        log_service = get_log_service()
+
+        # Counts and recent activity arrive together in one round trip,
+        # aggregated database-side (see sql/dashboard_snapshot.sql)
+        snapshot = log_service.get_dashboard_snapshot()
+        total_imports = snapshot.get('total', 0)
+        successful_imports = snapshot.get('completed', 0)
+        failed_imports = snapshot.get('failed', 0)
+        recent_imports = snapshot.get('recent', [])
         
         # Calculate success rate
         success_rate = (successful_imports / total_imports * 100) if total_imports > 0 else 0
@@ -40,10 +41,11 @@ def get_dashboard_stats():
         }), 500
 
 @admin_bp.route('/system/health', methods=['GET'])
+@cache.cached(timeout=30)
 def get_system_health():
     """Get system health status"""
     try:
-        log_service = ImportLogService()
+        log_service = get_log_service()
         
         # Basic health checks
         health_status = {
@@ -53,8 +55,8 @@ def get_system_health():
             'system_uptime': datetime.now().isoformat()
         }
         
-        # Get last import status
-        recent_logs = log_service.get_recent_logs(limit=1)
+        # Get last import status - project only the three fields reported
+        recent_logs = log_service.get_recent_logs(limit=1, columns='status, started_at, import_type')
         if recent_logs:
             last_import = recent_logs[0]
             health_status['last_import'] = {
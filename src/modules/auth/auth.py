@@ -1,8 +1,19 @@
 from flask import Blueprint, request, jsonify, session
+import hashlib
+import hmac
 import os
 
 auth_bp = Blueprint('auth', __name__)
 
+# Hash the admin password once at import so login only hashes the
+# submitted candidate, and compare digests in constant time to avoid
+# leaking password length/prefix via timing.
+_admin_password = os.getenv('ADMIN_PASSWORD')
+_ADMIN_PASSWORD_HASH = hashlib.sha256(_admin_password.encode()).digest() if _admin_password else None
+
+# Env vars don't change while the process runs - resolve once at import
+_HAS_ENV_2FA = bool(os.getenv('ADMIN_2FA_SECRET'))
+
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """Authenticate user with password (first step)"""
@@ -15,18 +26,17 @@ def login():
         if not password:
             return jsonify({'success': False, 'error': 'Password is required'}), 400
         
-        # Get admin password from environment
-        admin_password = os.getenv('ADMIN_PASSWORD')
-        if not admin_password:
+        if not _ADMIN_PASSWORD_HASH:
             return jsonify({'success': False, 'error': 'Admin password not configured'}), 500
-        
-        # Verify password
-        if password == admin_password:
+
+        # Verify password (constant-time comparison)
+        candidate_hash = hashlib.sha256(password.encode()).digest()
+        if hmac.compare_digest(candidate_hash, _ADMIN_PASSWORD_HASH):
             # Set password verification in session
             session['password_verified'] = True
             
             # Check if 2FA is enabled
-            has_2fa = bool(session.get('2fa_enabled') or os.getenv('ADMIN_2FA_SECRET'))
+            has_2fa = session.get('2fa_enabled', False) or _HAS_ENV_2FA
             
             if has_2fa:
                 # 2FA required - don't set full authentication yet
@@ -63,15 +73,18 @@ def logout():
 def status():
     """Get authentication status"""
     try:
-        return jsonify({
+        response = jsonify({
             'success': True,
             'data': {
                 'authenticated': session.get('authenticated', False),
                 'password_verified': session.get('password_verified', False),
                 '2fa_verified': session.get('2fa_verified', False),
-                '2fa_enabled': bool(session.get('2fa_enabled') or os.getenv('ADMIN_2FA_SECRET'))
+                '2fa_enabled': session.get('2fa_enabled', False) or _HAS_ENV_2FA
             }
         })
+        # The UI polls this - let the browser reuse the answer briefly
+        response.headers['Cache-Control'] = 'private, max-age=5'
+        return response
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -1,56 +1,66 @@
 import pyotp
 import qrcode
+import qrcode.image.svg
 import io
 import base64
-from flask import Blueprint, jsonify, request, session
+from functools import lru_cache
+from flask import Blueprint, jsonify, request, session, send_file, url_for
 import os
 
 two_factor_bp = Blueprint('two_factor', __name__)
 
+# Env vars don't change while the process runs - resolve once at import
+_ENV_2FA_SECRET = os.getenv('ADMIN_2FA_SECRET')
+
+@lru_cache(maxsize=16)
+def _totp(secret):
+    """Get a cached TOTP instance for a secret (base32 decode happens once)"""
+    return pyotp.TOTP(secret)
+
 class TwoFactorService:
     """Service for handling Two-Factor Authentication"""
-    
+
     @staticmethod
     def generate_secret():
         """Generate a new TOTP secret"""
         return pyotp.random_base32()
-    
+
     @staticmethod
-    def generate_qr_code(secret, user_email="admin@algorated.com.au"):
-        """Generate QR code for authenticator app setup"""
+    def generate_qr_svg(secret, user_email="admin@algorated.com.au"):
+        """Generate QR code SVG bytes for authenticator app setup"""
         # Create TOTP URI
-        totp_uri = pyotp.totp.TOTP(secret).provisioning_uri(
+        totp_uri = _totp(secret).provisioning_uri(
             name=user_email,
             issuer_name="Algorated Admin"
         )
-        
-        # Generate QR code
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
+
+        # Generate QR code as SVG - skips PIL image construction and PNG
+        # zlib compression, which dominate the PNG path
+        qr = qrcode.QRCode(version=1, box_size=10, border=5, image_factory=qrcode.image.svg.SvgImage)
         qr.add_data(totp_uri)
         qr.make(fit=True)
-        
-        # Create QR code image
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert to base64 string
+
+        img = qr.make_image()
+
         buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        qr_code_data = base64.b64encode(buffer.getvalue()).decode()
-        
-        return f"data:image/png;base64,{qr_code_data}"
-    
+        img.save(buffer)
+        return buffer.getvalue()
+
+    @staticmethod
+    def generate_qr_code(secret, user_email="admin@algorated.com.au"):
+        """Generate QR code as a base64 data URI (legacy inline form)"""
+        qr_code_data = base64.b64encode(TwoFactorService.generate_qr_svg(secret, user_email)).decode()
+        return f"data:image/svg+xml;base64,{qr_code_data}"
+
     @staticmethod
     def verify_token(secret, token):
         """Verify TOTP token"""
-        totp = pyotp.TOTP(secret)
-        return totp.verify(token, valid_window=1)  # Allow 1 window tolerance
-    
+        return _totp(secret).verify(token, valid_window=1)  # Allow 1 window tolerance
+
     @staticmethod
     def get_current_token(secret):
         """Get current TOTP token (for testing)"""
-        totp = pyotp.TOTP(secret)
-        return totp.now()
+        return _totp(secret).now()
 
 @two_factor_bp.route('/setup', methods=['POST'])
 def setup_2fa():
@@ -65,28 +75,51 @@ def setup_2fa():
         
         # Generate new secret
         secret = TwoFactorService.generate_secret()
-        
-        # Generate QR code
-        qr_code = TwoFactorService.generate_qr_code(secret)
-        
+
         # Store secret in session temporarily (until verified)
         session['temp_2fa_secret'] = secret
-        
+
+        # The QR image is streamed from its own endpoint instead of being
+        # base64-inflated into this JSON response
         return jsonify({
             'success': True,
             'data': {
                 'secret': secret,
-                'qr_code': qr_code,
+                'qr_url': url_for('two_factor.get_2fa_qr'),
                 'manual_entry_key': secret
             }
         })
-        
+
     except Exception as e:
         return jsonify({
             'success': False,
             'error': f"Failed to setup 2FA: {str(e)}"
         }), 500
 
+@two_factor_bp.route('/qr.svg', methods=['GET'])
+def get_2fa_qr():
+    """Stream the QR code image for the pending 2FA setup"""
+    try:
+        secret = session.get('temp_2fa_secret')
+        if not secret:
+            return jsonify({
+                'success': False,
+                'error': '2FA setup not initiated'
+            }), 404
+
+        svg_bytes = TwoFactorService.generate_qr_svg(secret)
+        # The URL is the same for every setup but the secret behind it
+        # changes each time - any caching would enroll a dead secret
+        response = send_file(io.BytesIO(svg_bytes), mimetype='image/svg+xml', max_age=0)
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f"Failed to generate QR code: {str(e)}"
+        }), 500
+
 @two_factor_bp.route('/verify-setup', methods=['POST'])
 def verify_2fa_setup():
     """Verify 2FA setup with first token"""
@@ -153,7 +186,7 @@ def verify_2fa():
             }), 401
         
         # Get 2FA secret (in production, get from database)
-        secret = session.get('2fa_secret') or os.getenv('ADMIN_2FA_SECRET')
+        secret = session.get('2fa_secret') or _ENV_2FA_SECRET
         if not secret:
             return jsonify({
                 'success': False,
@@ -186,11 +219,11 @@ def get_2fa_status():
     """Get 2FA status for current user"""
     try:
         # Check if 2FA is enabled
-        is_enabled = bool(session.get('2fa_enabled') or os.getenv('ADMIN_2FA_SECRET'))
+        is_enabled = session.get('2fa_enabled', False) or bool(_ENV_2FA_SECRET)
         is_verified = session.get('2fa_verified', False)
         password_verified = session.get('password_verified', False)
-        
-        return jsonify({
+
+        response = jsonify({
             'success': True,
             'data': {
                 'enabled': is_enabled,
@@ -199,7 +232,10 @@ def get_2fa_status():
                 'authenticated': session.get('authenticated', False)
             }
         })
-        
+        # The UI polls this - let the browser reuse the answer briefly
+        response.headers['Cache-Control'] = 'private, max-age=5'
+        return response
+
     except Exception as e:
         return jsonify({
             'success': False,
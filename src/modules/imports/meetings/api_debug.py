@@ -1,17 +1,18 @@
 from flask import Blueprint, jsonify
-import requests
+import httpx
 import os
+from collections import deque
 from datetime import datetime
 
 api_debug_bp = Blueprint('api_debug', __name__)
 
 @api_debug_bp.route('/raw-api-response', methods=['GET'])
-def get_raw_api_response():
+async def get_raw_api_response():
     """Get raw API response to examine field structure"""
     try:
         # Use a date we know has meetings
         target_date = "29/08/2025"
-        
+
         # Get API key from environment
         api_key = os.getenv('PUNTING_FORM_API_KEY')
         if not api_key:
@@ -19,17 +20,19 @@ def get_raw_api_response():
                 'error': 'API key not found',
                 'message': 'PUNTING_FORM_API_KEY environment variable not set'
             }), 500
-        
-        # Make API call
+
+        # Make API call without pinning a worker thread for the full
+        # upstream round trip
         url = "https://api.puntingform.com.au/v2/form/meetingslist"
         params = {
             'meetingDate': target_date,
             'apiKey': api_key
         }
-        
-        response = requests.get(url, params=params, timeout=30)
+
+        async with httpx.AsyncClient(timeout=30) as client:
+            response = await client.get(url, params=params)
         response.raise_for_status()
-        
+
         api_data = response.json()
         
         # Get first meeting for detailed examination
@@ -68,42 +71,42 @@ def get_raw_api_response():
 def _find_possible_field_matches(meeting_data):
     """Find possible field matches for our target fields"""
     target_fields = ['sectionals_updated', 'expected_condition', 'results_updated']
-    possible_matches = {}
-    
-    def search_nested(obj, path=""):
-        matches = []
+
+    # Precompute keyword tuples once instead of re-splitting each target
+    # on every key comparison
+    target_keywords = [(target, tuple(target.split('_'))) for target in target_fields]
+
+    possible_matches = {target: [] for target in target_fields}
+
+    # Iterative breadth-first walk - avoids Python recursion overhead and
+    # per-frame list rebuilds on large nested API payloads
+    queue = deque([(meeting_data, "")])
+    while queue:
+        obj, path = queue.popleft()
+
         if isinstance(obj, dict):
             for key, value in obj.items():
                 current_path = f"{path}.{key}" if path else key
-                
+
                 # Check if key contains any target field keywords
                 key_lower = key.lower()
-                for target in target_fields:
-                    target_words = target.split('_')
-                    if any(word in key_lower for word in target_words):
-                        matches.append({
+                for target, words in target_keywords:
+                    if any(word in key_lower for word in words):
+                        possible_matches[target].append({
                             'path': current_path,
                             'key': key,
                             'value': value,
                             'target_field': target
                         })
-                
-                # Recursively search nested objects
+
                 if isinstance(value, (dict, list)):
-                    matches.extend(search_nested(value, current_path))
-        
+                    queue.append((value, current_path))
+
         elif isinstance(obj, list):
             for i, item in enumerate(obj):
-                current_path = f"{path}[{i}]" if path else f"[{i}]"
-                matches.extend(search_nested(item, current_path))
-        
-        return matches
-    
-    all_matches = search_nested(meeting_data)
-    
-    # Group by target field
-    for target in target_fields:
-        possible_matches[target] = [m for m in all_matches if m['target_field'] == target]
-    
+                if isinstance(item, (dict, list)):
+                    current_path = f"{path}[{i}]" if path else f"[{i}]"
+                    queue.append((item, current_path))
+
     return possible_matches
 
@@ -5,8 +5,8 @@ API endpoints for managing meeting status and archiving
 """
 
 from flask import Blueprint, request, jsonify
-from datetime import datetime, date
-from .meeting_status_service import MeetingStatusService
+from datetime import date
+from .meeting_status_service import get_service
 from ...auth.auth import require_auth
 
 meeting_status_bp = Blueprint('meeting_status', __name__)
@@ -16,14 +16,25 @@ meeting_status_bp = Blueprint('meeting_status', __name__)
 def get_status_summary():
     """Get summary of meeting statuses"""
     try:
-        service = MeetingStatusService()
+        service = get_service()
         result = service.get_meeting_status_summary()
-        
+
         if result['success']:
-            return jsonify({
+            summary = result['summary']
+
+            # Counts change rarely; a 304 lets idle polls skip the
+            # serialization and response body entirely
+            etag = f'W/"{summary["active_meetings"]}-{summary["archived_meetings"]}-{summary["total_meetings"]}"'
+            if request.headers.get('If-None-Match') == etag:
+                return '', 304
+
+            response = jsonify({
                 'success': True,
-                'data': result['summary']
+                'data': summary
             })
+            response.headers['ETag'] = etag
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
         else:
             return jsonify({
                 'success': False,
@@ -48,14 +59,16 @@ def archive_old_meetings():
         cutoff_date = None
         if cutoff_date_str:
             try:
-                cutoff_date = datetime.strptime(cutoff_date_str, '%Y-%m-%d').date()
+                # fromisoformat is C-accelerated - no format-string
+                # interpreter like strptime
+                cutoff_date = date.fromisoformat(cutoff_date_str)
             except ValueError:
                 return jsonify({
                     'success': False,
                     'error': 'Invalid date format. Use YYYY-MM-DD format.'
                 }), 400
         
-        service = MeetingStatusService()
+        service = get_service()
         result = service.archive_old_meetings(cutoff_date)
         
         if result['success']:
@@ -107,7 +120,7 @@ def toggle_meeting_status():
                 'error': 'status must be "active" or "archived"'
             }), 400
         
-        service = MeetingStatusService()
+        service = get_service()
         result = service.toggle_meeting_status(meeting_id, new_status)
         
         if result['success']:
@@ -143,9 +156,12 @@ def get_meetings_by_status(status):
         # Get pagination parameters
         limit = min(int(request.args.get('limit', 50)), 100)  # Max 100
         offset = int(request.args.get('offset', 0))
-        
-        service = MeetingStatusService()
-        result = service.get_meetings_by_status(status, limit, offset)
+
+        # Callers needing more than the listing columns can ask explicitly
+        fields = request.args.get('fields')
+
+        service = get_service()
+        result = service.get_meetings_by_status(status, limit, offset, columns=fields)
         
         if result['success']:
             return jsonify({
@@ -6,18 +6,21 @@ Handles archiving and status management for meetings
 
 import os
 from datetime import datetime, date
+from functools import lru_cache
 from supabase import create_client, Client
 
+# Credentials are fixed for the life of the process - read them once at
+# import instead of per instantiation
+_SUPABASE_URL = os.environ.get('SUPABASE_URL')
+_SUPABASE_KEY = os.environ.get('SUPABASE_SERVICE_ROLE_KEY')
+
 class MeetingStatusService:
     def __init__(self):
         # Initialize Supabase client
-        supabase_url = os.getenv('SUPABASE_URL')
-        supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        
-        if not supabase_url or not supabase_key:
+        if not _SUPABASE_URL or not _SUPABASE_KEY:
             raise ValueError("Supabase credentials not configured")
-        
-        self.supabase: Client = create_client(supabase_url, supabase_key)
+
+        self.supabase: Client = create_client(_SUPABASE_URL, _SUPABASE_KEY)
     
     def archive_old_meetings(self, cutoff_date=None):
         """
@@ -36,33 +39,31 @@ class MeetingStatusService:
         cutoff_str = cutoff_date.strftime('%Y-%m-%d')
         
         try:
-            # Get meetings to archive first (for counting)
-            meetings_to_archive = self.supabase.table('meetings').select('meeting_id, track_name, meeting_date').eq('status', 'active').lt('meeting_date', cutoff_str).execute()
-            
-            count_to_archive = len(meetings_to_archive.data) if meetings_to_archive.data else 0
-            
-            if count_to_archive == 0:
+            # Archive in a single round trip - the UPDATE already returns
+            # the affected rows, so the old pre-count SELECT just repeated
+            # the same index scan
+            archive_result = self.supabase.table('meetings').update({
+                'status': 'archived',
+                'archived_at': datetime.now().isoformat()
+            }).eq('status', 'active').lt('meeting_date', cutoff_str).execute()
+
+            archived_meetings = archive_result.data or []
+            archived_count = len(archived_meetings)
+
+            if archived_count == 0:
                 return {
                     'success': True,
                     'archived_count': 0,
                     'message': f'No active meetings found before {cutoff_date}',
                     'cutoff_date': cutoff_str
                 }
-            
-            # Archive the meetings
-            archive_result = self.supabase.table('meetings').update({
-                'status': 'archived',
-                'archived_at': datetime.now().isoformat()
-            }).eq('status', 'active').lt('meeting_date', cutoff_str).execute()
-            
-            archived_count = len(archive_result.data) if archive_result.data else 0
-            
+
             return {
                 'success': True,
                 'archived_count': archived_count,
                 'message': f'Successfully archived {archived_count} meetings before {cutoff_date}',
                 'cutoff_date': cutoff_str,
-                'archived_meetings': meetings_to_archive.data[:10]  # First 10 for logging
+                'archived_meetings': archived_meetings[:10]  # First 10 for logging
             }
             
         except Exception as e:
@@ -81,17 +82,33 @@ class MeetingStatusService:
             dict: Status summary with counts
         """
         try:
-            # Get active meetings count
-            active_result = self.supabase.table('meetings').select('meeting_id', count='exact').eq('status', 'active').execute()
-            active_count = active_result.count if active_result.count is not None else 0
-            
-            # Get archived meetings count
-            archived_result = self.supabase.table('meetings').select('meeting_id', count='exact').eq('status', 'archived').execute()
-            archived_count = archived_result.count if archived_result.count is not None else 0
-            
-            # Get total count
-            total_result = self.supabase.table('meetings').select('meeting_id', count='exact').execute()
-            total_count = total_result.count if total_result.count is not None else 0
+            # One grouped aggregate round trip via the meeting_status_counts()
+            # Postgres function (sql/meeting_status_counts.sql), with a
+            # fallback to per-status HEAD counts if it isn't deployed
+            active_count = archived_count = total_count = None
+            try:
+                result = self.supabase.rpc('meeting_status_counts').execute()
+                if result.data:
+                    counts = result.data
+                    active_count = counts.get('active', 0)
+                    archived_count = counts.get('archived', 0)
+                    total_count = counts.get('total', 0)
+            except Exception as rpc_error:
+                print(f"meeting_status_counts RPC unavailable, falling back to count queries: {rpc_error}")
+
+            if total_count is None:
+                # Get active meetings count (head=True returns only the count
+                # header - no row payload crosses the wire)
+                active_result = self.supabase.table('meetings').select('meeting_id', count='exact', head=True).eq('status', 'active').execute()
+                active_count = active_result.count if active_result.count is not None else 0
+
+                # Get archived meetings count
+                archived_result = self.supabase.table('meetings').select('meeting_id', count='exact', head=True).eq('status', 'archived').execute()
+                archived_count = archived_result.count if archived_result.count is not None else 0
+
+                # Get total count
+                total_result = self.supabase.table('meetings').select('meeting_id', count='exact', head=True).execute()
+                total_count = total_result.count if total_result.count is not None else 0
             
             return {
                 'success': True,
@@ -160,20 +177,25 @@ class MeetingStatusService:
                 'error': str(e)
             }
     
-    def get_meetings_by_status(self, status='active', limit=50, offset=0):
+    # Columns the listing UI actually renders - select('*') shipped every
+    # wide column (rail position, condition fields, ...) just to page a table
+    LIST_COLUMNS = 'meeting_id, track_name, track_state, meeting_date, status, archived_at'
+
+    def get_meetings_by_status(self, status='active', limit=50, offset=0, columns=None):
         """
         Get meetings filtered by status
-        
+
         Args:
             status: 'active', 'archived', or 'all'
             limit: Number of meetings to return
             offset: Offset for pagination
-            
+            columns: Optional comma-separated projection (defaults to LIST_COLUMNS)
+
         Returns:
             dict: Meetings data
         """
         try:
-            query = self.supabase.table('meetings').select('*').order('meeting_date', desc=True)
+            query = self.supabase.table('meetings').select(columns or self.LIST_COLUMNS).order('meeting_date', desc=True)
             
             if status != 'all':
                 query = query.eq('status', status)
@@ -194,3 +216,13 @@ class MeetingStatusService:
                 'count': 0
             }
 
+
+@lru_cache(maxsize=1)
+def get_service() -> MeetingStatusService:
+    """Get the shared MeetingStatusService instance
+
+    Constructing the service builds a fresh Supabase httpx client (TLS
+    context, auth headers); reusing one instance keeps PostgREST
+    keep-alive connections warm across requests.
+    """
+    return MeetingStatusService()
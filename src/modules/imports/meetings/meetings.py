@@ -1,95 +1,123 @@
-from flask import Blueprint, jsonify, request
-from datetime import datetime, timedelta, timezone
+from flask import Blueprint, current_app, jsonify, request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import hashlib
+import logging
+import orjson
 import requests
 import os
-from src.shared.import_log import ImportLogService
-from src.modules.imports.meetings.meetings_import_service import MeetingsImportService
-from src.modules.imports.meetings.import_log_enhancer import ImportLogEnhancer
-
-# Define AEST timezone (UTC+10)
-AEST = timezone(timedelta(hours=10))
+import time
+from src.shared.import_log import get_log_service
+from src.modules.imports.meetings.meetings_import_service import get_import_service
+from src.modules.imports.meetings.import_log_enhancer import ImportLogEnhancer, au_to_iso_date, format_au_date
+from src.shared.cache import invalidate_dashboard_cache
 
 meetings_bp = Blueprint('meetings', __name__)
 
+# %s-style args keep formatting lazy - nothing is built for filtered levels
+logger = logging.getLogger(__name__)
+
+# Read once at import - os.getenv per request is a needless environ
+# lookup for a value that never changes within the process
+PUNTING_FORM_API_KEY = os.environ.get('PUNTING_FORM_API_KEY')
+
+# Shared HTTP session for Punting Form probes - keeps the TCP/TLS
+# connection alive between health checks instead of a full handshake each
+_session = requests.Session()
+_session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Imports run off the request thread - a worker would otherwise block for
+# the whole API fetch + bulk write. One worker serializes overlapping
+# manual triggers instead of racing them against each other.
+_import_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='meetings-import')
+
+def _run_meetings_import(app, iso_date, test_mode, import_mode, log_id):
+    """Execute a meetings import and close out its log entry
+
+    Runs on the import executor; the log row (already 'running') is the
+    contract with the polling /import/meetings/status endpoint. `app` is
+    the Flask app captured by the route - the executor thread has no
+    request context of its own.
+    """
+    log_service = get_log_service()
+    try:
+        result = get_import_service().import_meetings_for_date(iso_date, test_mode, log_id=log_id)
+
+        message = ImportLogEnhancer.create_import_summary(result, import_mode)
+        log_service.update_log(
+            log_id=log_id,
+            status='completed',
+            records_processed=result.get('total_meetings', 0),
+            records_inserted=result.get('inserted', 0),
+            records_updated=result.get('updated', 0),
+            message=message
+        )
+    except Exception as e:
+        logger.warning("Meetings import failed for %s: %s", iso_date, e)
+        log_service.update_log(
+            log_id=log_id,
+            status='failed',
+            error_message=str(e)
+        )
+
+    # Import changed the stats - drop the cached dashboard responses.
+    # Flask-Caching resolves its backend via current_app, so push the
+    # captured app's context first; without it the delete raises and
+    # the stale cache survives the import.
+    with app.app_context():
+        invalidate_dashboard_cache()
+
 @meetings_bp.route('/import/meetings', methods=['POST'])
 def import_meetings():
-    """Manual trigger for meetings import"""
+    """Manual trigger for meetings import (runs in the background)"""
     try:
         # Get date and test mode from request or use defaults
         data = request.get_json() or {}
         date_str = data.get('date')
         test_mode = data.get('test_mode', False)  # Default to production mode
-        
+
         if date_str:
             # Convert from Australian format DD/MM/YYYY to ISO format
             try:
-                date_obj = datetime.strptime(date_str, '%d/%m/%Y')
-                iso_date = date_obj.strftime('%Y-%m-%d')
+                iso_date = au_to_iso_date(date_str)
             except ValueError:
                 return jsonify({
                     'success': False,
                     'error': 'Invalid date format. Use DD/MM/YYYY format.'
                 }), 400
         else:
-            # Default to tomorrow
-            tomorrow = datetime.now() + timedelta(days=1)
-            iso_date = tomorrow.strftime('%Y-%m-%d')
-            date_str = tomorrow.strftime('%d/%m/%Y')
-        
-        # Initialize services
-        import_service = MeetingsImportService()
-        log_service = ImportLogService()
-        
+            # Default to tomorrow - date.isoformat() is C-implemented, no
+            # strftime locale machinery for either representation
+            tomorrow = (datetime.now() + timedelta(days=1)).date()
+            iso_date = tomorrow.isoformat()
+            date_str = f"{tomorrow.day:02d}/{tomorrow.month:02d}/{tomorrow.year:04d}"
+
         # Determine import mode and trigger type
         import_mode = 'test' if test_mode else 'production'
-        
-        # Start import log
-        log_id = log_service.create_log(
+
+        # Start import log, then hand off and return immediately - the
+        # client polls /import/meetings/status for progress
+        log_id = get_log_service().create_log(
             import_type='meetings',
             trigger_type='manual',
             import_date=iso_date,
             import_mode=import_mode
         )
-        
-        try:
-            # Perform the import with test mode
-            result = import_service.import_meetings_for_date(iso_date, test_mode)
-            
-            # Update log with success
-            message = ImportLogEnhancer.create_import_summary(result, import_mode)
-            
-            log_service.update_log(
-                log_id=log_id,
-                status='completed',
-                records_processed=result.get('total_meetings', 0),
-                records_inserted=result.get('inserted', 0),
-                records_updated=result.get('updated', 0),
-                message=message
-            )
-            
-            return jsonify({
-                'success': True,
-                'message': f"Import completed for {date_str}" + (" (TEST MODE)" if test_mode else ""),
-                'data': result,
-                'log_id': log_id,
-                'test_mode': test_mode
-            })
-            
-        except Exception as e:
-            # Update log with error
-            log_service.update_log(
-                log_id=log_id,
-                status='failed',
-                error_message=str(e)
-            )
-            
-            return jsonify({
-                'success': False,
-                'error': str(e),
-                'log_id': log_id,
-                'test_mode': test_mode
-            }), 500
-            
+
+        _import_executor.submit(
+            _run_meetings_import,
+            current_app._get_current_object(),
+            iso_date, test_mode, import_mode, log_id
+        )
+
+        return jsonify({
+            'success': True,
+            'message': f"Import started for {date_str}" + (" (TEST MODE)" if test_mode else ""),
+            'status': 'queued',
+            'log_id': log_id,
+            'test_mode': test_mode
+        }), 202
+
     except Exception as e:
         return jsonify({
             'success': False,
@@ -100,7 +128,7 @@ def import_meetings():
 def get_import_status():
     """Get the status of the last import"""
     try:
-        log_service = ImportLogService()
+        log_service = get_log_service()
         last_log = log_service.get_last_import_status()
         
         if not last_log:
@@ -112,26 +140,38 @@ def get_import_status():
                 }
             })
         
-        # Format dates in Australian format for display
+        # Weak ETag over the fields that change when the log advances -
+        # polling UIs hit this every few seconds, and a 304 skips all the
+        # formatting and serialization below when nothing moved. The
+        # record counters are part of the tag so in-flight progress
+        # flushes (update_log_progress) invalidate it; without them a
+        # running import would 304 until completion.
+        etag = (
+            f'W/"{last_log.get("id")}-{last_log.get("status")}'
+            f'-{last_log.get("completed_at") or last_log.get("started_at")}'
+            f'-{last_log.get("records_processed", 0)}'
+            f'-{last_log.get("records_inserted", 0)}'
+            f'-{last_log.get("records_updated", 0)}"'
+        )
+        if request.headers.get('If-None-Match') == etag:
+            return '', 304
+
+        # Format dates in Australian format for display - the cached
+        # helpers make repeat polls of the same log a dict lookup
         started_at_display = None
         completed_at_display = None
         target_date_display = None
-        
+
         if last_log.get('started_at'):
-            started_dt = datetime.fromisoformat(last_log['started_at'].replace('Z', '+00:00'))
-            started_aest = started_dt.astimezone(AEST)
-            started_at_display = started_aest.strftime('%d/%m/%Y %I:%M %p AEST')
-        
+            started_at_display = ImportLogEnhancer.format_timestamp(last_log['started_at'])
+
         if last_log.get('completed_at'):
-            completed_dt = datetime.fromisoformat(last_log['completed_at'].replace('Z', '+00:00'))
-            completed_aest = completed_dt.astimezone(AEST)
-            completed_at_display = completed_aest.strftime('%d/%m/%Y %I:%M %p AEST')
-        
+            completed_at_display = ImportLogEnhancer.format_timestamp(last_log['completed_at'])
+
         if last_log.get('import_date'):
-            target_dt = datetime.strptime(last_log['import_date'], '%Y-%m-%d')
-            target_date_display = target_dt.strftime('%d/%m/%Y')
+            target_date_display = format_au_date(last_log['import_date'])
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'data': {
                 'id': last_log.get('id'),
@@ -147,52 +187,90 @@ def get_import_status():
                 'error_message': last_log.get('error_message')
             }
         })
-        
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
     except Exception as e:
         return jsonify({
             'success': False,
             'error': f"Failed to get status: {str(e)}"
         }), 500
 
+def _format_log_row(log):
+    """Shape one import log row for the frontend logs table"""
+    enhanced_log = ImportLogEnhancer.format_log_entry(log)
+
+    return {
+        'id': log.get('id'),
+        'status': log.get('status'),
+        'trigger_type': log.get('trigger_type'),
+        'import_mode': log.get('import_mode', 'production'),
+        'formatted_type': enhanced_log['formatted_type'],
+        'formatted_date': enhanced_log.get('formatted_date'),
+        'target_date': log.get('import_date'),
+        'records_processed': log.get('records_processed', 0),
+        'records_inserted': log.get('records_inserted', 0),
+        'records_updated': log.get('records_updated', 0),
+        'summary': enhanced_log['summary'],
+        'message': log.get('message'),
+        'error_message': ImportLogEnhancer.format_error_message(log.get('error_message', '')),
+        'status_badge': enhanced_log['status_badge']
+    }
+
+# Bursts of UI polls on the logs endpoint coalesce onto one Supabase
+# query: entries live for _LOGS_TTL seconds, keyed by (before, limit)
+_LOGS_TTL = 2.0
+_logs_cache = {}
+
 @meetings_bp.route('/import/meetings/logs', methods=['GET'])
 def get_import_logs():
     """Get import history logs with enhanced formatting"""
     try:
-        log_service = ImportLogService()
-        logs = log_service.get_recent_logs(limit=20)
-        
-        # Format logs for display using enhancer
-        logs_data = []
-        for log in logs:
-            enhanced_log = ImportLogEnhancer.format_log_entry(log)
-            
-            # Extract key fields for frontend
-            logs_data.append({
-                'id': log.get('id'),
-                'status': log.get('status'),
-                'trigger_type': log.get('trigger_type'),
-                'import_mode': log.get('import_mode', 'production'),
-                'formatted_type': enhanced_log['formatted_type'],
-                'formatted_date': enhanced_log.get('formatted_date'),
-                'target_date': log.get('import_date'),
-                'records_processed': log.get('records_processed', 0),
-                'records_inserted': log.get('records_inserted', 0),
-                'records_updated': log.get('records_updated', 0),
-                'summary': enhanced_log['summary'],
-                'message': log.get('message'),
-                'error_message': ImportLogEnhancer.format_error_message(log.get('error_message', '')),
-                'status_badge': enhanced_log['status_badge']
-            })
-        
-        # Get statistics
-        stats = ImportLogEnhancer.get_import_statistics(logs)
-        
-        return jsonify({
-            'success': True,
-            'logs': logs_data,
-            'statistics': stats
-        })
-        
+        # Keyset pagination: pass back next_cursor as ?before=... to get
+        # the next page without an OFFSET scan
+        before = request.args.get('before')
+        limit = min(int(request.args.get('limit', 20)), 100)
+
+        cache_key = (before, limit)
+        now = time.monotonic()
+        entry = _logs_cache.get(cache_key)
+        if entry is not None and entry[0] > now:
+            payload, etag = entry[1], entry[2]
+        else:
+            logs = get_log_service().get_recent_logs(limit=limit, before=before)
+
+            # Format logs for display using enhancer; the comprehension feeds
+            # straight into the orjson-backed jsonify with no intermediate
+            # bookkeeping
+            logs_data = [_format_log_row(log) for log in logs]
+
+            # Get statistics
+            stats = ImportLogEnhancer.get_import_statistics(logs)
+
+            next_cursor = logs[-1].get('created_at') if len(logs) == limit else None
+
+            payload = {
+                'success': True,
+                'logs': logs_data,
+                'statistics': stats,
+                'next_cursor': next_cursor
+            }
+            etag = f'"{hashlib.md5(orjson.dumps(payload)).hexdigest()}"'
+
+            if len(_logs_cache) > 32:
+                _logs_cache.clear()
+            _logs_cache[cache_key] = (now + _LOGS_TTL, payload, etag)
+
+        # Idle polls short-circuit to an empty 304 on the HTTP layer
+        if request.headers.get('If-None-Match') == etag:
+            return '', 304
+
+        response = jsonify(payload)
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
     except Exception as e:
         return jsonify({
             'success': False,
@@ -203,7 +281,7 @@ def get_import_logs():
 def test_api_connection():
     """Test API connectivity"""
     try:
-        api_key = os.getenv('PUNTING_FORM_API_KEY')
+        api_key = PUNTING_FORM_API_KEY
         if not api_key:
             return jsonify({
                 'success': False,
@@ -221,8 +299,7 @@ def test_api_connection():
         if date_str:
             # Convert from Australian format DD/MM/YYYY to ISO format
             try:
-                date_obj = datetime.strptime(date_str, '%d/%m/%Y')
-                test_date = date_obj.strftime('%Y-%m-%d')
+                test_date = au_to_iso_date(date_str)
                 display_date = date_str
             except ValueError:
                 return jsonify({
@@ -231,9 +308,9 @@ def test_api_connection():
                 }), 400
         else:
             # Default to tomorrow
-            tomorrow = datetime.now() + timedelta(days=1)
-            test_date = tomorrow.strftime('%Y-%m-%d')
-            display_date = tomorrow.strftime('%d/%m/%Y')
+            tomorrow = (datetime.now() + timedelta(days=1)).date()
+            test_date = tomorrow.isoformat()
+            display_date = f"{tomorrow.day:02d}/{tomorrow.month:02d}/{tomorrow.year:04d}"
         
         url = "https://api.puntingform.com.au/v2/form/meetingslist"
         params = {
@@ -241,11 +318,13 @@ def test_api_connection():
             "apiKey": api_key
         }
         
-        response = requests.get(url, params=params, timeout=30)
-        
+        response = _session.get(url, params=params, timeout=30)
+
         if response.status_code == 200:
-            data = response.json()
-            meeting_count = len(data.get('Meetings', []))
+            data = orjson.loads(response.content)
+            # The API has served the list under both 'payLoad' and
+            # 'Meetings' envelopes - accept either
+            meeting_count = len(data.get('payLoad') or data.get('Meetings') or [])
             
             return jsonify({
                 'success': True,
@@ -278,12 +357,9 @@ def test_api_connection():
 def clear_test_data():
     """Clear only test data from meetings and import_logs tables"""
     try:
-        from src.modules.imports.meetings.meetings_import_service import MeetingsImportService
-        from src.shared.import_log import ImportLogService
-        
-        # Initialize the service (which has Supabase access)
-        service = MeetingsImportService()
-        log_service = ImportLogService()
+        # Shared service singletons (which have Supabase access)
+        service = get_import_service()
+        log_service = get_log_service()
         
         # Get request parameters
         data = request.get_json() or {}
@@ -292,21 +368,22 @@ def clear_test_data():
         
         results = {}
         
-        # Clear test meetings only
+        # Clear test meetings only (count=exact + return=minimal gets the
+        # deleted-row count from a header without transferring the rows)
         if clear_meetings:
             try:
                 # Delete only test meetings (is_test_data = true)
-                meetings_result = service.supabase.table('meetings').delete().eq('is_test_data', True).execute()
-                results['meetings_cleared'] = len(meetings_result.data) if meetings_result.data else 0
+                meetings_result = service.supabase.table('meetings').delete(count='exact', returning='minimal').eq('is_test_data', True).execute()
+                results['meetings_cleared'] = meetings_result.count or 0
             except Exception as e:
                 results['meetings_error'] = str(e)
-        
+
         # Clear test import logs only
         if clear_logs:
             try:
                 # Delete only test import logs (import_mode = 'test')
-                logs_result = service.supabase.table('import_logs').delete().eq('import_mode', 'test').execute()
-                results['logs_cleared'] = len(logs_result.data) if logs_result.data else 0
+                logs_result = service.supabase.table('import_logs').delete(count='exact', returning='minimal').eq('import_mode', 'test').execute()
+                results['logs_cleared'] = logs_result.count or 0
             except Exception as e:
                 results['logs_error'] = str(e)
         
@@ -328,7 +405,7 @@ def clear_test_data():
             )
         except Exception as log_error:
             # Don't fail the clear operation if logging fails
-            print(f"Failed to log clear operation: {log_error}")
+            logger.warning("Failed to log clear operation: %s", log_error)
         
         return jsonify({
             'success': True,
@@ -1,39 +1,209 @@
+import hashlib
+import ijson
+import logging
+import orjson
 import requests
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from supabase import create_client, Client
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from supabase import Client
+from src.shared.import_log import get_log_service
+from src.shared.supabase_client import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+# Shared pool for overlapping independent bulk-write chunks; sized to
+# stay within the Supabase client's connection pool
+_write_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='meetings-write')
+
+# Fallback field-name groups for API payload extraction, hoisted from
+# per-meeting list literals. The tuples preserve priority order for
+# direct lookups; the frozensets hold the names pre-lowercased so the
+# recursive search does one set-membership test per key instead of
+# lowercasing every candidate name on every comparison.
+_EXPECTED_CONDITION_FIELDS = (
+    'expectedCondition', 'expected_condition', 'ExpectedCondition',
+    'condition', 'trackCondition', 'track_condition', 'trackConditions',
+    'weather', 'weatherCondition', 'going', 'surface', 'trackSurface'
+)
+
+_RESULTS_UPDATED_FIELDS = (
+    'resultsUpdated', 'results_updated', 'ResultsUpdated',
+    'resultUpdated', 'result_updated', 'lastResultUpdate',
+    'resultsLastUpdated', 'resultTime', 'finishedAt',
+    'completedAt', 'raceFinished', 'resultsAvailable'
+)
+
+_SECTIONALS_UPDATED_FIELDS = (
+    'sectionalsUpdated', 'sectionals_updated', 'SectionalsUpdated',
+    'sectionalUpdated', 'sectional_updated', 'lastSectionalUpdate',
+    'sectionalsLastUpdated', 'sectionalTime', 'sectionalData',
+    'timingUpdated', 'sectionalAvailable'
+)
+
+_RATINGS_UPDATED_FIELDS = (
+    'ratingsUpdated', 'ratings_updated', 'RatingsUpdated',
+    'ratingUpdated', 'rating_updated', 'lastRatingUpdate',
+    'ratingsLastUpdated', 'formUpdated', 'form_updated'
+)
+
+_RAIL_POSITION_FIELDS = (
+    'railPosition', 'rail_position', 'RailPosition', 'rail',
+    'railPos', 'trackRail', 'barrierPosition'
+)
+
+_EXPECTED_CONDITION_LOWER = frozenset(f.lower() for f in _EXPECTED_CONDITION_FIELDS)
+_RESULTS_UPDATED_LOWER = frozenset(f.lower() for f in _RESULTS_UPDATED_FIELDS)
+_SECTIONALS_UPDATED_LOWER = frozenset(f.lower() for f in _SECTIONALS_UPDATED_FIELDS)
+_RATINGS_UPDATED_LOWER = frozenset(f.lower() for f in _RATINGS_UPDATED_FIELDS)
+_RAIL_POSITION_LOWER = frozenset(f.lower() for f in _RAIL_POSITION_FIELDS)
+
+# The five groups as (record column, alias tuple, lowered alias set) -
+# drives the combined extraction in _extract_fallback_fields
+_FIELD_GROUPS = (
+    ('expected_condition', _EXPECTED_CONDITION_FIELDS, _EXPECTED_CONDITION_LOWER),
+    ('results_updated', _RESULTS_UPDATED_FIELDS, _RESULTS_UPDATED_LOWER),
+    ('sectionals_updated', _SECTIONALS_UPDATED_FIELDS, _SECTIONALS_UPDATED_LOWER),
+    ('ratings_updated', _RATINGS_UPDATED_FIELDS, _RATINGS_UPDATED_LOWER),
+    ('rail_position', _RAIL_POSITION_FIELDS, _RAIL_POSITION_LOWER),
+)
+
+# Union of every fallback name - a flat meeting whose keys miss this set
+# entirely can skip all five searches
+_ALL_FALLBACK_LOWER = (_EXPECTED_CONDITION_LOWER | _RESULTS_UPDATED_LOWER
+                       | _SECTIONALS_UPDATED_LOWER | _RATINGS_UPDATED_LOWER
+                       | _RAIL_POSITION_LOWER)
+
+# Alias tuples for the track sub-object, tried in order by _first()
+_MEETING_ID_KEYS = ('meetingId', 'MeetingId', 'id')
+_TRACK_NAME_KEYS = ('name', 'Name', 'trackName', 'TrackName')
+_TRACK_ID_KEYS = ('trackId', 'TrackId', 'id', 'Id')
+_TRACK_STATE_KEYS = ('state', 'State', 'trackState', 'TrackState')
+_TRACK_LOCATION_KEYS = ('location', 'Location', 'trackLocation')
+_TRACK_ABBREVIATION_KEYS = ('abbrev', 'Abbrev', 'abbreviation', 'Abbreviation')
+
+@lru_cache(maxsize=256)
+def _present_alias(shape, aliases):
+    """First alias actually present in a payload shape, or None
+
+    Meetings in one API response share a schema, so which casing variant
+    a field uses is a property of the shape, not the row. Resolving it
+    once per (shape, alias group) specializes the per-meeting lookups to
+    a single direct .get() instead of trying every variant every time.
+    """
+    keys = set(shape)
+    for alias in aliases:
+        if alias in keys:
+            return alias
+    return None
 
 class MeetingsImportService:
+    # Rows per bulk write - keeps individual PostgREST payloads well under
+    # request-size limits while still batching a whole date in one or two calls
+    WRITE_CHUNK_SIZE = 500
+
+    # Distinct payload shapes to remember in the field-path cache before
+    # it resets (the API only ever serves a handful per day)
+    PATH_CACHE_MAX = 64
+
+    # How many levels the fallback field search will descend; the fields
+    # it looks for have never appeared deeper than two levels down
+    SEARCH_MAX_DEPTH = 4
+
+    # How long a successful connectivity probe stays good for
+    PROBE_TTL = 60.0
+
     def __init__(self):
         self.api_base_url = "https://api.puntingform.com.au/v2"
         self.api_key = os.getenv('PUNTING_FORM_API_KEY')
-        
-        # Initialize Supabase client
-        supabase_url = os.getenv('SUPABASE_URL')
-        supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        
-        if not supabase_url or not supabase_key:
-            raise ValueError("Supabase credentials not configured")
-        
-        self.supabase: Client = create_client(supabase_url, supabase_key)
-        
+
+        # Process-wide Supabase client - one underlying HTTP pool shared
+        # with everything else that talks to PostgREST (raises ValueError
+        # if credentials are missing)
+        self.supabase: Client = get_supabase_client()
+
         if not self.api_key:
             raise ValueError("Punting Form API key not configured")
+
+        # Pooled session so repeat API fetches reuse keep-alive
+        # connections instead of paying a fresh TCP+TLS handshake, with
+        # retries on transient gateway errors
+        # Meetings in one payload share their schema shape, so where a
+        # fallback field was found (or that it's absent) for one meeting
+        # holds for the rest: shape -> {group name -> path or None}
+        self._field_path_cache = {}
+
+        # Last successful connectivity probe: (monotonic time, date, result)
+        self._last_probe = None
+
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': 'algorate-admin/1.0'})
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=50,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        ))
     
-    def import_meetings_for_date(self, date_str, test_mode=False):
+    def import_meetings_for_date(self, date_str, test_mode=False, log_id=None):
         """
         Import meetings for a specific date (ISO format YYYY-MM-DD)
         Returns dict with import statistics
-        
+
         Args:
             date_str: Date in YYYY-MM-DD format
             test_mode: If True, marks imported data as test data
+            log_id: Import log to report per-chunk progress against
+                (buffered - see ImportLogService.update_log_progress);
+                None skips progress reporting
         """
         try:
-            # Fetch meetings from API
-            meetings_data = self._fetch_meetings_from_api(date_str)
-            
-            if not meetings_data or 'Meetings' not in meetings_data:
+            # One timestamp for the whole import - datetime.now()
+            # .isoformat() per row is a clock read plus string formatting
+            # for a value that should be uniform across the batch anyway.
+            now_iso = datetime.now().isoformat()
+            total_meetings = 0
+            inserted = updated = errors = 0
+            records = []
+            log_service = get_log_service() if log_id is not None else None
+            reported_total = 0
+
+            # Meetings stream off the wire one at a time; records
+            # accumulate up to a write chunk and flush, so peak memory is
+            # one chunk of flat records rather than the raw response plus
+            # every nested meeting dict at once. A bad meeting only costs
+            # its own record, not the batch.
+            for meeting in self._iter_meetings_from_api(date_str):
+                total_meetings += 1
+                try:
+                    records.append(self._build_meeting_record(meeting, date_str, test_mode, now_iso))
+                except Exception as e:
+                    errors += 1
+                    meeting_id = meeting.get('meetingId', meeting.get('MeetingId', meeting.get('id', 'unknown')))
+                    print(f"Error processing meeting {meeting_id}: {str(e)}")
+
+                if len(records) >= self.WRITE_CHUNK_SIZE:
+                    chunk_inserted, chunk_updated = self._write_meeting_records(records, now_iso)
+                    inserted += chunk_inserted
+                    updated += chunk_updated
+                    records = []
+
+                    # Per-chunk progress so the status endpoint moves
+                    # while a big import runs; the buffer coalesces the
+                    # actual writes
+                    if log_service is not None:
+                        log_service.update_log_progress(
+                            log_id,
+                            records_processed=total_meetings - reported_total,
+                            records_inserted=chunk_inserted,
+                            records_updated=chunk_updated
+                        )
+                        reported_total = total_meetings
+
+            if total_meetings == 0:
                 return {
                     'total_meetings': 0,
                     'inserted': 0,
@@ -41,26 +211,12 @@ class MeetingsImportService:
                     'errors': 0,
                     'message': 'No meetings found for this date'
                 }
-            
-            meetings = meetings_data['Meetings']
-            total_meetings = len(meetings)
-            inserted = 0
-            updated = 0
-            errors = 0
-            
-            # Process each meeting
-            for meeting in meetings:
-                try:
-                    result = self._process_meeting(meeting, date_str, test_mode)
-                    if result == 'inserted':
-                        inserted += 1
-                    elif result == 'updated':
-                        updated += 1
-                except Exception as e:
-                    errors += 1
-                    meeting_id = meeting.get('meetingId', meeting.get('MeetingId', meeting.get('id', 'unknown')))
-                    print(f"Error processing meeting {meeting_id}: {str(e)}")
-            
+
+            if records:
+                chunk_inserted, chunk_updated = self._write_meeting_records(records, now_iso)
+                inserted += chunk_inserted
+                updated += chunk_updated
+
             return {
                 'total_meetings': total_meetings,
                 'inserted': inserted,
@@ -73,165 +229,386 @@ class MeetingsImportService:
             raise Exception(f"Import failed: {str(e)}")
     
     def _fetch_meetings_from_api(self, date_str):
-        """Fetch meetings data from Punting Form API"""
+        """Fetch meetings data from Punting Form API in one piece
+
+        Used by the connectivity probe, which only needs a count; the
+        import path streams via _iter_meetings_from_api instead.
+        """
         url = f"{self.api_base_url}/form/meetingslist"
         params = {
             "meetingDate": date_str,
             "apiKey": self.api_key
         }
-        
-        response = requests.get(url, params=params, timeout=30)
-        
+
+        response = self.session.get(url, params=params, timeout=30)
+
         if response.status_code != 200:
             raise Exception(f"API request failed with status {response.status_code}: {response.text}")
-        
-        return response.json()
-    
-    def _safe_get_field(self, data, field_names):
-        """
-        Safely extract field from data with multiple possible field names
-        Returns None if field is not found or is empty
+
+        # orjson's C parser is 2-5x faster than the stdlib decoder that
+        # response.json() uses - the meetings list payload is large
+        return orjson.loads(response.content)
+
+    def _iter_meetings_from_api(self, date_str):
+        """Stream meetings for a date from the Punting Form API
+
+        ijson yields one meeting dict at a time off the wire, so a big
+        date never holds the raw response bytes plus a fully parsed
+        meetings list in memory together - each meeting is released as
+        soon as the caller has processed it. The list has shipped under
+        both 'payLoad' and 'Meetings' envelopes, so the event stream is
+        sniffed for whichever top-level key arrives.
         """
-        # First try direct field access
-        for field_name in field_names:
-            value = data.get(field_name)
+        url = f"{self.api_base_url}/form/meetingslist"
+        params = {
+            "meetingDate": date_str,
+            "apiKey": self.api_key
+        }
+
+        with self.session.get(url, params=params, stream=True, timeout=30) as response:
+            if response.status_code != 200:
+                raise Exception(f"API request failed with status {response.status_code}: {response.text}")
+
+            # Let urllib3 undo any transfer encoding before ijson sees it
+            response.raw.decode_content = True
+            events = ijson.parse(response.raw)
+            for prefix, event, value in events:
+                if prefix == '' and event == 'map_key' and value in ('payLoad', 'Meetings'):
+                    yield from ijson.common.items(events, f'{value}.item')
+                    return
+    
+    @staticmethod
+    def _first(data, keys, default=''):
+        """Return the first non-empty value among the aliased keys"""
+        get = data.get
+        for key in keys:
+            value = get(key)
             if value is not None and value != '':
                 return value
-        
-        # If not found, try recursive search in nested objects
-        return self._find_field_recursive(data, field_names)
-    
-    def _find_field_recursive(self, data, field_names, path=""):
+        return default
+
+    def _pick(self, data, shape, aliases, default=''):
+        """Shape-specialized _first: one direct .get() per lookup
+
+        The alias chosen for this shape is resolved once by
+        _present_alias; only a row whose resolved key holds an empty
+        value pays for the full alias scan.
         """
-        Recursively search for field in nested objects
-        Returns the first matching field value found
+        key = _present_alias(shape, aliases)
+        if key is None:
+            return default
+        value = data.get(key)
+        if value is not None and value != '':
+            return value
+        return self._first(data, aliases, default)
+
+    def _extract_fallback_fields(self, meeting_data, shape):
         """
-        if isinstance(data, dict):
-            for key, value in data.items():
-                current_path = f"{path}.{key}" if path else key
-                
-                # Check if this key matches any of our target field names (case insensitive)
-                for field_name in field_names:
-                    if key.lower() == field_name.lower():
-                        if value is not None and value != '':
-                            return value
-                
-                # Recursively search in nested objects
-                if isinstance(value, dict):
-                    result = self._find_field_recursive(value, field_names, current_path)
-                    if result is not None:
-                        return result
-                elif isinstance(value, list) and len(value) > 0 and isinstance(value[0], dict):
-                    # Search in first item of list if it contains objects
-                    result = self._find_field_recursive(value[0], field_names, f"{current_path}[0]")
-                    if result is not None:
-                        return result
-        
-        return None
+        Resolve all five fallback field groups for one meeting
+
+        Direct top-level aliases are tried first (tuple order preserves
+        priority). Whatever is still missing replays the cached path for
+        this payload shape, and only the groups with no usable cache
+        entry go into one combined tree walk - a single DFS fills every
+        remaining group at once instead of one full walk per group.
+        Returns {group name: value or None} covering all five groups.
+        """
+        out = {}
+        pending = {}
+        for group, field_names, lowered in _FIELD_GROUPS:
+            value = self._first(meeting_data, field_names, default=None)
+            if value is not None:
+                out[group] = value
+            else:
+                pending[group] = lowered
+
+        if not pending:
+            return out
+
+        # Replay cached paths for this payload shape, if any
+        group_cache = self._field_path_cache.get(shape)
+        if group_cache:
+            for group in list(pending):
+                if group not in group_cache:
+                    continue
+                path = group_cache[group]
+                if path is None:
+                    out[group] = None
+                    del pending[group]
+                    continue
+                value = meeting_data
+                for key in path:
+                    if isinstance(value, list):
+                        value = value[0] if value and isinstance(value[0], dict) else None
+                    if not isinstance(value, dict):
+                        value = None
+                        break
+                    value = value.get(key)
+                if value is not None and value != '':
+                    out[group] = value
+                    del pending[group]
+                # Cached path went stale for this particular meeting -
+                # leave the group pending so the walk below re-resolves it
+
+        if pending:
+            key_to_group = {alias: group
+                            for group, lowered in pending.items()
+                            for alias in lowered}
+            found = {}
+            self._collect_fields(meeting_data, key_to_group, found, len(pending))
+
+            if len(self._field_path_cache) > self.PATH_CACHE_MAX:
+                self._field_path_cache.clear()
+            cache = self._field_path_cache.setdefault(shape, {})
+            for group in pending:
+                value, path = found.get(group, (None, None))
+                out[group] = value
+                cache[group] = path if value is not None else None
+
+        return out
+
+    def _collect_fields(self, data, key_to_group, out, n_groups, path=(), visited=None):
+        """
+        One DFS that fills every pending field group simultaneously
+
+        key_to_group maps lowercased alias -> group name; out collects
+        {group: (value, key path)} for the first non-empty match per
+        group, in traversal order. Returns True once every group is
+        filled so callers and recursive frames can stop early.
+
+        The walk is bounded: descent stops at SEARCH_MAX_DEPTH, and a
+        visited set of object ids keeps shared subtrees (the API payload
+        reuses objects in places) from being traversed more than once -
+        without it a pathological payload makes the search quadratic,
+        and a cyclic one would recurse forever.
+        """
+        if not isinstance(data, dict):
+            return False
+        if visited is None:
+            visited = {id(data)}
+        descend = len(path) + 1 < self.SEARCH_MAX_DEPTH
+        for key, value in data.items():
+            group = key_to_group.get(key.lower())
+            if group is not None and group not in out and value is not None and value != '':
+                out[group] = (value, path + (key,))
+                if len(out) == n_groups:
+                    return True
+
+            if not descend:
+                continue
+
+            if isinstance(value, dict):
+                if id(value) in visited:
+                    continue
+                visited.add(id(value))
+                if self._collect_fields(value, key_to_group, out, n_groups, path + (key,), visited):
+                    return True
+            elif isinstance(value, list) and len(value) > 0 and isinstance(value[0], dict):
+                # Search in first item of list if it contains objects
+                if id(value[0]) in visited:
+                    continue
+                visited.add(id(value[0]))
+                if self._collect_fields(value[0], key_to_group, out, n_groups, path + (key,), visited):
+                    return True
+
+        return False
     
     def _debug_available_fields(self, meeting_data, meeting_id):
         """Log all available fields for debugging NULL field issues"""
-        print(f"🔍 DEBUG: Available fields for meeting {meeting_id}:")
-        
-        def print_fields(obj, prefix="", max_depth=3, current_depth=0):
+        logger.debug("🔍 Available fields for meeting %s:", meeting_id)
+
+        def log_fields(obj, prefix="", max_depth=3, current_depth=0):
             if current_depth >= max_depth:
                 return
-                
+
             if isinstance(obj, dict):
                 for key, value in obj.items():
                     if isinstance(value, dict):
-                        print(f"  {prefix}{key}: [nested object with {len(value)} fields]")
+                        logger.debug("  %s%s: [nested object with %d fields]", prefix, key, len(value))
                         if current_depth < max_depth - 1:
-                            print_fields(value, f"{prefix}{key}.", max_depth, current_depth + 1)
+                            log_fields(value, f"{prefix}{key}.", max_depth, current_depth + 1)
                     elif isinstance(value, list):
-                        print(f"  {prefix}{key}: [list with {len(value)} items]")
+                        logger.debug("  %s%s: [list with %d items]", prefix, key, len(value))
                         if len(value) > 0 and isinstance(value[0], dict):
-                            print(f"  {prefix}{key}[0]: [object with {len(value[0])} fields]")
+                            logger.debug("  %s%s[0]: [object with %d fields]", prefix, key, len(value[0]))
                     else:
                         value_str = str(value)[:50] + "..." if len(str(value)) > 50 else str(value)
-                        print(f"  {prefix}{key}: {type(value).__name__} = {value_str}")
-        
-        print_fields(meeting_data)
+                        logger.debug("  %s%s: %s = %s", prefix, key, type(value).__name__, value_str)
+
+        log_fields(meeting_data)
     
-    def _process_meeting(self, meeting_data, date_str, test_mode=False):
+    def _write_meeting_records(self, records, now_iso=None):
         """
-        Process a single meeting and insert/update in database
-        Returns 'inserted' or 'updated'
+        Write a batch of meeting records with O(1) round trips
+        Returns (inserted, updated) counts
+
+        The old per-meeting loop cost two HTTPS round trips per meeting
+        (existence SELECT, then INSERT or UPDATE). This does one existence
+        query for the whole batch, then bulk-inserts the new rows and
+        bulk-upserts the existing ones in chunks.
         """
+        if not records:
+            return 0, 0
+
+        # The API can repeat a meeting within one response, and a
+        # repeated pf_meeting_id breaks every bulk path - ON CONFLICT
+        # can't touch the same row twice in one statement, and a plain
+        # insert of both copies violates the unique key. Collapse
+        # duplicates up front, last occurrence winning (the old
+        # per-row loop ended with the later copy's data too).
+        by_id = {r['pf_meeting_id']: r for r in records}
+        if len(by_id) != len(records):
+            records = list(by_id.values())
+
+        if now_iso is None:
+            now_iso = datetime.now().isoformat()
+
+        # Preferred path: one round trip through the bulk_upsert_meetings()
+        # Postgres function (sql/bulk_upsert_meetings.sql), which runs the
+        # whole batch as a single INSERT ... ON CONFLICT and reports the
+        # inserted/updated split. created_at rides on every record; the
+        # function only applies it to new rows.
+        try:
+            payload = [dict(r, created_at=now_iso) for r in records]
+            result = self.supabase.rpc('bulk_upsert_meetings', {'payload': payload}).execute()
+            if result.data:
+                row = result.data[0] if isinstance(result.data, list) else result.data
+                return row.get('inserted', 0), row.get('updated', 0)
+        except Exception as rpc_error:
+            print(f"bulk_upsert_meetings RPC unavailable, falling back to batched writes: {rpc_error}")
+
+        # One existence query per chunk of ids (the IN() list rides in the
+        # query string, so unbounded batches would overflow URL limits).
+        # content_hash comes back alongside so unchanged rows can be
+        # skipped entirely.
+        ids = [r['pf_meeting_id'] for r in records]
+        existing_hashes = {}
+        for start in range(0, len(ids), self.WRITE_CHUNK_SIZE):
+            existing = self.supabase.table('meetings').select('pf_meeting_id, content_hash').in_(
+                'pf_meeting_id', ids[start:start + self.WRITE_CHUNK_SIZE]
+            ).execute()
+            for row in existing.data or []:
+                existing_hashes[row['pf_meeting_id']] = row.get('content_hash')
+
+        # New rows get created_at; existing rows must not overwrite it.
+        # PostgREST bulk payloads need uniform keys, so the two groups go
+        # through separate calls. Existing rows with an unchanged content
+        # hash are dropped - rewriting them would only churn WAL.
+        new_records = []
+        update_records = []
+        for record in records:
+            pf_id = record['pf_meeting_id']
+            if pf_id not in existing_hashes:
+                new_records.append(dict(record, created_at=now_iso))
+            elif existing_hashes[pf_id] != record['content_hash']:
+                update_records.append(record)
+
+        # Chunk writes are independent of each other, so they overlap on
+        # the write executor - PostgREST calls are I/O-bound and release
+        # the GIL while waiting. Iterating the map() drains all futures
+        # and re-raises the first failure.
+        insert_chunks = [new_records[start:start + self.WRITE_CHUNK_SIZE]
+                         for start in range(0, len(new_records), self.WRITE_CHUNK_SIZE)]
+        update_chunks = [update_records[start:start + self.WRITE_CHUNK_SIZE]
+                         for start in range(0, len(update_records), self.WRITE_CHUNK_SIZE)]
+
+        def _insert(chunk):
+            self.supabase.table('meetings').insert(chunk, returning='minimal').execute()
+
+        def _upsert(chunk):
+            self.supabase.table('meetings').upsert(
+                chunk, on_conflict='pf_meeting_id', returning='minimal'
+            ).execute()
+
+        if len(insert_chunks) + len(update_chunks) > 1:
+            list(_write_executor.map(_insert, insert_chunks))
+            list(_write_executor.map(_upsert, update_chunks))
+        else:
+            for chunk in insert_chunks:
+                _insert(chunk)
+            for chunk in update_chunks:
+                _upsert(chunk)
+
+        return len(new_records), len(update_records)
+
+    def _build_meeting_record(self, meeting_data, date_str, test_mode=False, now_iso=None):
+        """
+        Build the meetings row dict for a single meeting from the API payload
+        """
+        if now_iso is None:
+            now_iso = datetime.now().isoformat()
+
+        # Bound method cached in a local - skips the attribute lookup on
+        # each of the dozen get() calls below
+        get = meeting_data.get
+
+        # The shape key specializes alias resolution and lets sibling
+        # meetings with the same schema reuse fallback search results
+        shape = tuple(sorted(meeting_data.keys()))
+
         # Extract meeting data with correct field names - handle multiple possible formats
-        pf_meeting_id = str(meeting_data.get('meetingId', meeting_data.get('MeetingId', meeting_data.get('id', ''))))
-        
-        # Track data might be nested in 'track' object or directly in meeting data
-        track_data = meeting_data.get('track', meeting_data.get('Track', meeting_data))
-        track_name = track_data.get('name', track_data.get('Name', track_data.get('trackName', track_data.get('TrackName', ''))))
-        track_id = str(track_data.get('trackId', track_data.get('TrackId', track_data.get('id', track_data.get('Id', '')))))
-        track_state = track_data.get('state', track_data.get('State', track_data.get('trackState', track_data.get('TrackState', ''))))
-        track_location = track_data.get('location', track_data.get('Location', track_data.get('trackLocation', '')))
-        track_abbreviation = track_data.get('abbrev', track_data.get('Abbrev', track_data.get('abbreviation', track_data.get('Abbreviation', ''))))
-        
-        stage = meeting_data.get('stage', 'A')
-        tab_meeting = meeting_data.get('tabMeeting', True)
-        is_barrier_trial = meeting_data.get('isBarrierTrial', False)
-        is_jumps = meeting_data.get('isJumps', False)
-        has_sectionals = meeting_data.get('hasSectionals', False)
-        
-        # Enhanced field extraction with comprehensive fallbacks and debugging
-        expected_condition_fields = [
-            'expectedCondition', 'expected_condition', 'ExpectedCondition', 
-            'condition', 'trackCondition', 'track_condition', 'trackConditions',
-            'weather', 'weatherCondition', 'going', 'surface', 'trackSurface'
-        ]
-        
-        results_updated_fields = [
-            'resultsUpdated', 'results_updated', 'ResultsUpdated',
-            'resultUpdated', 'result_updated', 'lastResultUpdate',
-            'resultsLastUpdated', 'resultTime', 'finishedAt',
-            'completedAt', 'raceFinished', 'resultsAvailable'
-        ]
-        
-        sectionals_updated_fields = [
-            'sectionalsUpdated', 'sectionals_updated', 'SectionalsUpdated',
-            'sectionalUpdated', 'sectional_updated', 'lastSectionalUpdate',
-            'sectionalsLastUpdated', 'sectionalTime', 'sectionalData',
-            'timingUpdated', 'sectionalAvailable'
-        ]
-        
-        ratings_updated_fields = [
-            'ratingsUpdated', 'ratings_updated', 'RatingsUpdated',
-            'ratingUpdated', 'rating_updated', 'lastRatingUpdate',
-            'ratingsLastUpdated', 'formUpdated', 'form_updated'
-        ]
-        
-        # Extract fields with enhanced search
-        expected_condition = self._safe_get_field(meeting_data, expected_condition_fields)
-        results_updated = self._safe_get_field(meeting_data, results_updated_fields)
-        sectionals_updated = self._safe_get_field(meeting_data, sectionals_updated_fields)
-        ratings_updated = self._safe_get_field(meeting_data, ratings_updated_fields)
+        pf_meeting_id = str(self._pick(meeting_data, shape, _MEETING_ID_KEYS))
+
+        # Track data might be nested in 'track' object or directly in
+        # meeting data. _pick resolves the casing variant once per shape
+        # and then does a single direct lookup per field.
+        track_data = get('track', get('Track', meeting_data))
+        if track_data is meeting_data:
+            track_shape = shape
+        else:
+            track_shape = tuple(sorted(track_data.keys()))
+        track_name = self._pick(track_data, track_shape, _TRACK_NAME_KEYS)
+        track_id = str(self._pick(track_data, track_shape, _TRACK_ID_KEYS))
+        track_state = self._pick(track_data, track_shape, _TRACK_STATE_KEYS)
+        track_location = self._pick(track_data, track_shape, _TRACK_LOCATION_KEYS)
+        track_abbreviation = self._pick(track_data, track_shape, _TRACK_ABBREVIATION_KEYS)
         
-        # Enhanced debugging for NULL fields
-        missing_fields = []
-        if not expected_condition:
-            missing_fields.append('expected_condition')
-        if not results_updated:
-            missing_fields.append('results_updated')
-        if not sectionals_updated:
-            missing_fields.append('sectionals_updated')
-        if not ratings_updated:
-            missing_fields.append('ratings_updated')
-            
-        if missing_fields:
-            print(f"⚠️ Missing fields for meeting {pf_meeting_id}: {', '.join(missing_fields)}")
-            # Enable detailed debugging for first few meetings with missing fields
-            if len(missing_fields) >= 2:  # If 2 or more fields are missing, debug
-                self._debug_available_fields(meeting_data, pf_meeting_id)
+        stage = get('stage', 'A')
+        tab_meeting = get('tabMeeting', True)
+        is_barrier_trial = get('isBarrierTrial', False)
+        is_jumps = get('isJumps', False)
+        has_sectionals = get('hasSectionals', False)
         
-        # Extract rail position with enhanced search
-        rail_position_fields = [
-            'railPosition', 'rail_position', 'RailPosition', 'rail',
-            'railPos', 'trackRail', 'barrierPosition'
-        ]
-        rail_position = self._safe_get_field(meeting_data, rail_position_fields)
+        # Extract fields with enhanced search (candidate-name groups are
+        # module constants - see the top of this file).
+        # Cheap pre-check: if no top-level key is a fallback candidate
+        # and there is nothing nested to descend into, the extraction
+        # can only return None for every group - skip it outright
+        if not (_ALL_FALLBACK_LOWER & {k.lower() for k in meeting_data}) and not any(
+            isinstance(v, dict) or (isinstance(v, list) and v and isinstance(v[0], dict))
+            for v in meeting_data.values()
+        ):
+            expected_condition = results_updated = None
+            sectionals_updated = ratings_updated = rail_position = None
+        else:
+            fallback = self._extract_fallback_fields(meeting_data, shape)
+            expected_condition = fallback['expected_condition']
+            results_updated = fallback['results_updated']
+            sectionals_updated = fallback['sectionals_updated']
+            ratings_updated = fallback['ratings_updated']
+            rail_position = fallback['rail_position']
         
+        # Enhanced debugging for NULL fields - the whole block (list
+        # building included) only runs when DEBUG logging is on, so the
+        # production hot path pays a single boolean check per meeting
+        if logger.isEnabledFor(logging.DEBUG):
+            missing_fields = []
+            if not expected_condition:
+                missing_fields.append('expected_condition')
+            if not results_updated:
+                missing_fields.append('results_updated')
+            if not sectionals_updated:
+                missing_fields.append('sectionals_updated')
+            if not ratings_updated:
+                missing_fields.append('ratings_updated')
+
+            if missing_fields:
+                logger.debug("⚠️ Missing fields for meeting %s: %s", pf_meeting_id, ', '.join(missing_fields))
+                # Detailed field dump when 2 or more fields are missing
+                if len(missing_fields) >= 2:
+                    self._debug_available_fields(meeting_data, pf_meeting_id)
+
+
         # Prepare meeting record
         meeting_record = {
             'pf_meeting_id': pf_meeting_id,
@@ -255,40 +632,62 @@ class MeetingsImportService:
             'ratings_updated': ratings_updated,
             'status': 'active',  # New meetings are active by default
             'is_test_data': test_mode,  # Mark as test data if in test mode
-            'updated_at': datetime.now().isoformat()
+            'updated_at': now_iso
         }
-        
-        # Check if meeting already exists
-        existing = self.supabase.table('meetings').select('meeting_id').eq('pf_meeting_id', pf_meeting_id).execute()
-        
-        if existing.data:
-            # Update existing meeting
-            result = self.supabase.table('meetings').update(meeting_record).eq('pf_meeting_id', pf_meeting_id).execute()
-            return 'updated'
-        else:
-            # Insert new meeting
-            meeting_record['created_at'] = datetime.now().isoformat()
-            result = self.supabase.table('meetings').insert(meeting_record).execute()
-            return 'inserted'
+
+        # Stable content hash for change detection - updated_at is
+        # excluded so a re-import of identical data hashes identically
+        meeting_record['content_hash'] = hashlib.blake2b(
+            orjson.dumps(
+                {k: v for k, v in meeting_record.items() if k != 'updated_at'},
+                option=orjson.OPT_SORT_KEYS
+            ),
+            digest_size=16
+        ).hexdigest()
+
+        return meeting_record
     
     def test_api_connection(self):
-        """Test API connectivity"""
+        """Test API connectivity
+
+        The probe gets polled far more often than upstream changes, so a
+        success is reused for PROBE_TTL seconds instead of hitting the
+        API on every call. Failures are never cached - the next call
+        re-probes so a recovered upstream is noticed immediately.
+        """
         try:
             from datetime import timedelta
-            tomorrow = datetime.now() + timedelta(days=1)
-            test_date = tomorrow.strftime('%Y-%m-%d')
-            
+            tomorrow = (datetime.now() + timedelta(days=1)).date()
+            test_date = tomorrow.isoformat()
+
+            cached = self._last_probe
+            if cached is not None:
+                cached_at, cached_date, cached_result = cached
+                if cached_date == test_date and time.monotonic() - cached_at < self.PROBE_TTL:
+                    return cached_result
+
             data = self._fetch_meetings_from_api(test_date)
-            meeting_count = len(data.get('Meetings', []))
-            
-            return {
+            meeting_count = len(data.get('payLoad') or data.get('Meetings') or [])
+
+            result = {
                 'success': True,
                 'meeting_count': meeting_count,
                 'test_date': test_date
             }
+            self._last_probe = (time.monotonic(), test_date, result)
+            return result
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e)
             }
 
+
+@lru_cache(maxsize=1)
+def get_import_service() -> MeetingsImportService:
+    """Get the shared MeetingsImportService instance
+
+    Construction builds a Supabase client and an API session; reusing one
+    instance per process keeps both connection pools alive across requests.
+    """
+    return MeetingsImportService()
@@ -3,7 +3,7 @@ Flask routes for ratings polling management
 """
 
 from flask import Blueprint, jsonify, request
-from src.modules.imports.meetings.ratings_polling_service import RatingsPollingService
+from src.modules.imports.meetings.ratings_polling_service import get_polling_service
 from src.modules.auth.auth import require_auth
 
 ratings_polling_bp = Blueprint('ratings_polling', __name__)
@@ -22,7 +22,7 @@ def check_ratings_updates():
                 'error': 'days_back must be between 1 and 30'
             }), 400
         
-        polling_service = RatingsPollingService()
+        polling_service = get_polling_service()
         result = polling_service.check_ratings_updates(days_back)
         
         return jsonify({
@@ -50,7 +50,7 @@ def trigger_ratings_refresh():
                 'error': 'No meetings specified for refresh'
             }), 400
         
-        polling_service = RatingsPollingService()
+        polling_service = get_polling_service()
         result = polling_service.trigger_ratings_refresh(meetings_to_update)
         
         return jsonify({
@@ -79,7 +79,7 @@ def run_ratings_polling():
                 'error': 'days_back must be between 1 and 30'
             }), 400
         
-        polling_service = RatingsPollingService()
+        polling_service = get_polling_service()
         result = polling_service.run_ratings_polling_cycle(days_back, auto_refresh)
         
         return jsonify({
@@ -98,24 +98,27 @@ def run_ratings_polling():
 def get_ratings_status():
     """Get current ratings status and statistics"""
     try:
-        polling_service = RatingsPollingService()
-        
-        # Get recent meetings with ratings info
+        polling_service = get_polling_service()
+
+        # Let the database do the counting: two head-only count queries
+        # instead of pulling 50 rows across the wire just to tally them
+        total_result = polling_service.supabase.table('meetings').select(
+            'pf_meeting_id', count='exact', head=True
+        ).gte('meeting_date', '2025-08-20').execute()
+
+        with_ratings_result = polling_service.supabase.table('meetings').select(
+            'pf_meeting_id', count='exact', head=True
+        ).gte('meeting_date', '2025-08-20').not_.is_('ratings_updated', 'null').execute()
+
+        total_meetings = total_result.count or 0
+        meetings_with_ratings = with_ratings_result.count or 0
+        meetings_without_ratings = total_meetings - meetings_with_ratings
+
+        # Only the 10 displayed rows are fetched in full
         recent_meetings = polling_service.supabase.table('meetings').select(
             'pf_meeting_id, track_name, meeting_date, ratings_updated, status'
-        ).gte('meeting_date', '2025-08-20').order('meeting_date', desc=True).limit(50).execute()
-        
-        # Calculate statistics
-        total_meetings = len(recent_meetings.data) if recent_meetings.data else 0
-        meetings_with_ratings = 0
-        meetings_without_ratings = 0
-        
-        for meeting in recent_meetings.data or []:
-            if meeting.get('ratings_updated'):
-                meetings_with_ratings += 1
-            else:
-                meetings_without_ratings += 1
-        
+        ).gte('meeting_date', '2025-08-20').order('meeting_date', desc=True).limit(10).execute()
+
         return jsonify({
             'success': True,
             'data': {
@@ -123,7 +126,7 @@ def get_ratings_status():
                 'meetings_with_ratings': meetings_with_ratings,
                 'meetings_without_ratings': meetings_without_ratings,
                 'ratings_coverage_percent': round((meetings_with_ratings / total_meetings * 100) if total_meetings > 0 else 0, 1),
-                'recent_meetings': recent_meetings.data[:10] if recent_meetings.data else []
+                'recent_meetings': recent_meetings.data or []
             }
         })
         
@@ -1,56 +1,56 @@
+import threading
+import time
 from flask import Blueprint, request, jsonify
 from datetime import datetime, timedelta
+from functools import lru_cache
 from croniter import croniter
-import json
 from .task_scheduler import get_scheduler
 from ...modules.auth.auth import require_auth
-import os
-from supabase import create_client, Client
+from ...shared.supabase_client import get_supabase_client
 
 scheduler_bp = Blueprint('scheduler', __name__)
 
-# Initialize Supabase client lazily
-def get_supabase_client():
-    """Get Supabase client with lazy initialization"""
-    supabase_url = os.getenv('SUPABASE_URL')
-    supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-    
-    if not supabase_url or not supabase_key:
-        raise ValueError("Supabase credentials not configured")
-    
-    return create_client(supabase_url, supabase_key)
+@lru_cache(maxsize=256)
+def _cron_is_valid(expression):
+    """Whether a cron expression parses (cached - clients resubmit the
+    same handful of expressions, so each is validated once per process)"""
+    return croniter.is_valid(expression)
+
+# Column each schedule type reads; switching types nulls the other two
+# so a task never carries parameters from its previous schedule
+_SCHEDULE_PARAMS = {
+    'cron': 'cron_expression',
+    'interval': 'interval_minutes',
+    'one_time': 'scheduled_time',
+}
+_ALL_SCHEDULE_PARAMS = tuple(_SCHEDULE_PARAMS.values())
 
 @scheduler_bp.route('/scheduler/tasks', methods=['GET'])
 @require_auth
 def get_scheduled_tasks():
     """Get all scheduled tasks"""
     try:
+        # Deterministic pagination via ?page and ?size (1-based page)
+        page = max(request.args.get('page', 1, type=int), 1)
+        size = min(max(request.args.get('size', 100, type=int), 1), 500)
+        offset = (page - 1) * size
+
+        # Ask for exactly the columns the frontend renders - select('*')
+        # shipped and parsed every column only for the loop below to
+        # throw most of them away
         supabase = get_supabase_client()
-        result = supabase.table('scheduled_tasks').select('*').order('created_at', desc=True).execute()
-        
-        # Format tasks for frontend
-        tasks = []
-        for task in result.data:
-            formatted_task = {
-                'id': task['id'],
-                'task_name': task['task_name'],
-                'task_type': task['task_type'],
-                'cron_schedule': task.get('cron_schedule'),
-                'config': task.get('config', {}),
-                'is_active': task['is_active'],
-                'last_run_at': task.get('last_run_at'),
-                'last_run_status': task.get('last_run_status'),
-                'last_run_log': task.get('last_run_log'),
-                'next_run_at': task.get('next_run_at'),
-                'created_at': task['created_at'],
-                'updated_at': task['updated_at']
-            }
-            
-            # Add human-readable schedule description
-            formatted_task['schedule_description'] = _get_schedule_description(task)
-            
-            tasks.append(formatted_task)
-        
+        result = supabase.table('scheduled_tasks').select(
+            'id, task_name, task_type, cron_schedule, config, is_active, '
+            'last_run_at, last_run_status, last_run_log, next_run_at, '
+            'created_at, updated_at'
+        ).order('created_at', desc=True).range(offset, offset + size - 1).execute()
+
+        # Rows already have the right shape; annotate in place instead
+        # of rebuilding a dict per task
+        tasks = result.data or []
+        for task in tasks:
+            task['schedule_description'] = _get_schedule_description(task)
+
         return jsonify({
             'success': True,
             'tasks': tasks
@@ -68,47 +68,69 @@ def create_scheduled_task():
     """Create a new scheduled task"""
     try:
         data = request.get_json()
-        
-        # Validate required fields
+
+        # Accept one task object or a list of them - a batch validates
+        # in one pass and inserts with a single round trip instead of
+        # one POST per task
+        is_batch = isinstance(data, list)
+        incoming = data if is_batch else [data]
+
+        if not incoming:
+            return jsonify({
+                'success': False,
+                'error': 'No tasks provided'
+            }), 400
+
         required_fields = ['task_name', 'task_type', 'cron_schedule']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({
-                    'success': False,
-                    'error': f'Missing required field: {field}'
-                }), 400
-        
-        # Validate cron expression if provided
-        if data.get('cron_schedule'):
-            try:
-                croniter(data['cron_schedule'])
-            except Exception:
-                return jsonify({
-                    'success': False,
-                    'error': 'Invalid cron expression'
-                }), 400
-        
-        # Prepare task data
-        task_data = {
-            'task_name': data['task_name'],
-            'task_type': data['task_type'],
-            'cron_schedule': data['cron_schedule'],
-            'config': data.get('config', {}),
-            'is_active': data.get('is_active', True)
-        }
-        
-        # Calculate next run time
-        if data.get('cron_schedule'):
-            try:
-                cron = croniter(data['cron_schedule'], datetime.now())
-                task_data['next_run_at'] = cron.get_next(datetime).isoformat()
-            except:
-                pass
-        
-        # Insert task
+        now = datetime.now()
+        task_list = []
+
+        for item in incoming:
+            # Validate required fields
+            for field in required_fields:
+                if field not in item:
+                    return jsonify({
+                        'success': False,
+                        'error': f'Missing required field: {field}'
+                    }), 400
+
+            # Validate the cron expression once; the same iterator
+            # computes next_run_at below instead of being parsed twice
+            cron = None
+            if item.get('cron_schedule'):
+                try:
+                    cron = croniter(item['cron_schedule'], now)
+                except Exception:
+                    return jsonify({
+                        'success': False,
+                        'error': f"Invalid cron expression: {item['cron_schedule']}"
+                    }), 400
+
+            # next_run_at is always present so a mixed batch keeps
+            # uniform keys (PostgREST bulk inserts require them)
+            task_list.append({
+                'task_name': item['task_name'],
+                'task_type': item['task_type'],
+                'cron_schedule': item['cron_schedule'],
+                'config': item.get('config', {}),
+                'is_active': item.get('is_active', True),
+                'next_run_at': cron.get_next(datetime).isoformat() if cron is not None else None
+            })
+
+        # One insert for the whole batch
         supabase = get_supabase_client()
-        result = supabase.table('scheduled_tasks').insert(task_data).execute()
-        
+        result = supabase.table('scheduled_tasks').insert(task_list).execute()
+
+        # Nudge the scheduler so a task due sooner than its current
+        # sleep doesn't wait for the next tick
+        get_scheduler().wake()
+
+        if is_batch:
+            return jsonify({
+                'success': True,
+                'tasks': result.data or []
+            })
+
         return jsonify({
             'success': True,
             'task': result.data[0] if result.data else None
@@ -120,53 +142,77 @@ def create_scheduled_task():
             'error': str(e)
         }), 500
 
+@scheduler_bp.route('/scheduler/tasks/due', methods=['GET'])
+@require_auth
+def get_due_tasks():
+    """Get active tasks whose stored next_run_at has passed
+
+    Reads the denormalized next_run_at column (maintained on creation
+    and after each run) so the database answers "what should run now"
+    with an indexed scan - see sql/scheduled_tasks_next_run_index.sql -
+    instead of every schedule being re-evaluated in Python.
+    """
+    try:
+        now_iso = datetime.now().isoformat()
+        result = get_supabase_client().table('scheduled_tasks').select('*').eq(
+            'is_active', True
+        ).lte('next_run_at', now_iso).order('next_run_at').limit(50).execute()
+
+        return jsonify({
+            'success': True,
+            'tasks': result.data or []
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @scheduler_bp.route('/scheduler/tasks/<task_id>', methods=['PUT'])
 @require_auth
 def update_scheduled_task(task_id):
     """Update a scheduled task"""
     try:
         data = request.get_json()
-        
-        # Prepare update data
-        update_data = {}
-        
-        # Update allowed fields
-        allowed_fields = ['task_name', 'description', 'is_active', 'task_config']
-        for field in allowed_fields:
-            if field in data:
-                if field == 'task_config':
-                    update_data[field] = json.dumps(data[field])
-                else:
-                    update_data[field] = data[field]
-        
-        # Update schedule configuration if provided
+
+        # Simple passthrough fields in one comprehension. task_config
+        # travels as a dict - the column is jsonb and the client
+        # serializes the payload once, so pre-dumping it here stored a
+        # JSON string inside the JSON document and forced a decode on
+        # every read
+        update_data = {
+            field: data[field]
+            for field in ('task_name', 'description', 'is_active', 'task_config')
+            if field in data
+        }
+
+        # Update schedule configuration if provided - the params table
+        # replaces the per-type branch that repeated the same
+        # set-one-null-the-rest dance three times
         if 'schedule_type' in data:
             update_data['schedule_type'] = data['schedule_type']
-            
-            if data['schedule_type'] == 'cron' and 'cron_expression' in data:
-                try:
-                    croniter(data['cron_expression'])
-                    update_data['cron_expression'] = data['cron_expression']
-                    update_data['interval_minutes'] = None
-                    update_data['scheduled_time'] = None
-                except Exception:
+
+            param = _SCHEDULE_PARAMS.get(data['schedule_type'])
+            if param and param in data:
+                if param == 'cron_expression' and not _cron_is_valid(data[param]):
                     return jsonify({
                         'success': False,
                         'error': 'Invalid cron expression'
                     }), 400
-            elif data['schedule_type'] == 'interval' and 'interval_minutes' in data:
-                update_data['interval_minutes'] = data['interval_minutes']
-                update_data['cron_expression'] = None
-                update_data['scheduled_time'] = None
-            elif data['schedule_type'] == 'one_time' and 'scheduled_time' in data:
-                update_data['scheduled_time'] = data['scheduled_time']
-                update_data['cron_expression'] = None
-                update_data['interval_minutes'] = None
+                update_data[param] = data[param]
+                for other in _ALL_SCHEDULE_PARAMS:
+                    if other != param:
+                        update_data[other] = None
         
         if update_data:
             update_data['updated_at'] = datetime.now().isoformat()
             result = get_supabase_client().table('scheduled_tasks').update(update_data).eq('task_id', task_id).execute()
-            
+
+            # Re-evaluate sleeps against the new schedule right away
+            get_scheduler().wake()
+
+
             return jsonify({
                 'success': True,
                 'task': result.data[0] if result.data else None
@@ -189,7 +235,11 @@ def delete_scheduled_task(task_id):
     """Delete a scheduled task"""
     try:
         result = get_supabase_client().table('scheduled_tasks').delete().eq('task_id', task_id).execute()
-        
+
+        # A deleted task may have been the next due one - let the loop
+        # recompute its sleep
+        get_scheduler().wake()
+
         return jsonify({
             'success': True,
             'message': 'Task deleted successfully'
@@ -204,35 +254,72 @@ def delete_scheduled_task(task_id):
 @scheduler_bp.route('/scheduler/tasks/<task_id>/run', methods=['POST'])
 @require_auth
 def run_task_now(task_id):
-    """Manually trigger a scheduled task"""
+    """Manually trigger a scheduled task
+
+    Prefers the start_task() Postgres function (sql/start_task.sql),
+    whose conditional UPDATE claims the task and returns it in one
+    round trip - two concurrent run-now clicks can't both pass an
+    is_running check that happened in Python. Falls back to the old
+    select-then-check path when the function isn't deployed.
+    """
     try:
-        # Get task details
-        result = get_supabase_client().table('scheduled_tasks').select('*').eq('task_id', task_id).execute()
-        
+        supabase = get_supabase_client()
+        try:
+            result = supabase.rpc('start_task', {'p_task_id': str(task_id)}).execute()
+            if result.data:
+                # Claimed - the row comes back already marked running
+                get_scheduler().submit_task(result.data[0], already_marked=True)
+                return jsonify({
+                    'success': True,
+                    'message': 'Task execution started'
+                })
+
+            # Claim failed: distinguish missing from already running
+            exists = supabase.table('scheduled_tasks').select(
+                'task_id', count='exact', head=True
+            ).eq('task_id', task_id).execute()
+            if not (exists.count or 0):
+                return jsonify({
+                    'success': False,
+                    'error': 'Task not found'
+                }), 404
+            return jsonify({
+                'success': False,
+                'error': 'Task is already running'
+            }), 400
+        except Exception as rpc_error:
+            print(f"start_task RPC unavailable, falling back to select-then-run: {rpc_error}")
+
+        # Fallback: get task details - the same columns the scheduler's
+        # own due check fetches, which is everything _execute_task reads
+        result = supabase.table('scheduled_tasks').select(
+            'task_id, task_type, task_config, schedule_type, cron_expression, '
+            'interval_minutes, scheduled_time, last_run_at, is_running'
+        ).eq('task_id', task_id).execute()
+
         if not result.data:
             return jsonify({
                 'success': False,
                 'error': 'Task not found'
             }), 404
-        
+
         task = result.data[0]
-        
+
         if task['is_running']:
             return jsonify({
                 'success': False,
                 'error': 'Task is already running'
             }), 400
-        
-        # Execute task in background
-        import threading
-        thread = threading.Thread(target=get_scheduler()._execute_task, args=(task,), daemon=True)
-        thread.start()
-        
+
+        # Execute task in background on the scheduler's bounded pool -
+        # manual runs and scheduled runs share one concurrency cap
+        get_scheduler().submit_task(task)
+
         return jsonify({
             'success': True,
             'message': 'Task execution started'
         })
-        
+
     except Exception as e:
         return jsonify({
             'success': False,
@@ -244,12 +331,13 @@ def run_task_now(task_id):
 def get_scheduler_status():
     """Get scheduler status"""
     try:
+        active_count, running_count = _get_task_counts()
         return jsonify({
             'success': True,
             'status': {
                 'running': get_scheduler().running,
-                'active_tasks_count': _get_active_tasks_count(),
-                'running_tasks_count': _get_running_tasks_count()
+                'active_tasks_count': active_count,
+                'running_tasks_count': running_count
             }
         })
         
@@ -259,25 +347,63 @@ def get_scheduler_status():
             'error': str(e)
         }), 500
 
+# Human-readable names for the preset schedules the UI offers; anything
+# else falls through to the raw cron expression
+SCHEDULE_DESCRIPTIONS = {
+    '0 0 6 * * *': 'Daily at 6:00 AM',
+    '0 0 * * * *': 'Every hour',
+    '0 */6 * * * *': 'Every 6 hours',
+    '0 0 0 * * 0': 'Weekly on Sunday at midnight',
+}
+
 def _get_schedule_description(task):
     """Get human-readable schedule description"""
     cron_schedule = task.get('cron_schedule', '')
-    
-    if cron_schedule == '0 0 6 * * *':
-        return 'Daily at 6:00 AM'
-    elif cron_schedule == '0 0 * * * *':
-        return 'Every hour'
-    elif cron_schedule == '0 */6 * * * *':
-        return 'Every 6 hours'
-    elif cron_schedule == '0 0 0 * * 0':
-        return 'Weekly on Sunday at midnight'
-    else:
-        return f'Cron: {cron_schedule}'
+    return SCHEDULE_DESCRIPTIONS.get(cron_schedule, f'Cron: {cron_schedule}')
+
+# Status polls arrive every few seconds from every open dashboard tab;
+# the counts barely move on that timescale, so a short TTL collapses
+# the bursts into one query per window
+_COUNTS_TTL = 5.0
+_counts_lock = threading.Lock()
+_counts_cache = (0.0, None)
+
+def _get_task_counts():
+    """(active, running) task counts, cached for a few seconds"""
+    global _counts_cache
+    with _counts_lock:
+        fetched_at, counts = _counts_cache
+        if counts is not None and time.monotonic() - fetched_at < _COUNTS_TTL:
+            return counts
+
+    counts = _fetch_task_counts()
+    with _counts_lock:
+        _counts_cache = (time.monotonic(), counts)
+    return counts
+
+def _fetch_task_counts():
+    """(active, running) task counts in one round trip
+
+    Prefers the scheduler_status_counts() Postgres function
+    (sql/scheduler_status_counts.sql), which ships two integers instead
+    of two separate count calls; falls back to the per-count queries
+    when it is not installed. Both paths hit the partial indexes in
+    sql/scheduled_tasks_status_count_indexes.sql.
+    """
+    try:
+        result = get_supabase_client().rpc('scheduler_status_counts').execute()
+        if result.data:
+            row = result.data[0] if isinstance(result.data, list) else result.data
+            return row.get('active_count', 0), row.get('running_count', 0)
+    except Exception as rpc_error:
+        print(f"scheduler_status_counts RPC unavailable, falling back to count queries: {rpc_error}")
+
+    return _get_active_tasks_count(), _get_running_tasks_count()
 
 def _get_active_tasks_count():
     """Get count of active tasks"""
     try:
-        result = get_supabase_client().table('scheduled_tasks').select('task_id', count='exact').eq('is_active', True).execute()
+        result = get_supabase_client().table('scheduled_tasks').select('task_id', count='exact', head=True).eq('is_active', True).execute()
         return result.count or 0
     except:
         return 0
@@ -285,7 +411,7 @@ def _get_active_tasks_count():
 def _get_running_tasks_count():
     """Get count of currently running tasks"""
     try:
-        result = get_supabase_client().table('scheduled_tasks').select('task_id', count='exact').eq('is_running', True).execute()
+        result = get_supabase_client().table('scheduled_tasks').select('task_id', count='exact', head=True).eq('is_running', True).execute()
         return result.count or 0
     except:
         return 0
@@ -1,29 +1,78 @@
-import os
 import json
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
+from functools import lru_cache
 from croniter import croniter
-from supabase import create_client, Client
-from ..imports.meetings.meetings_import_service import MeetingsImportService
-from ...shared.import_log import ImportLogService
+from supabase import Client
+from ..imports.meetings.meetings_import_service import get_import_service
+from ...shared.import_log import get_log_service
+from ...shared.supabase_client import get_supabase_client
+
+# Per-thread croniter cache keyed by expression. The set of distinct
+# cron expressions is tiny and the loop re-checks them every tick, so
+# reusing an instance (rebased with set_current) skips re-tokenizing
+# the expression each time. Thread-local because croniter instances are
+# mutable and tasks complete on worker threads.
+_cron_local = threading.local()
+
+# Small pool so archiving can overlap the meetings import. Deliberately
+# separate from the scheduler's task executor: a task submitting its
+# archive step back onto the pool it runs on could deadlock once all
+# workers hold tasks waiting on their own archive futures.
+_archive_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='sched-archive')
+
+def _get_croniter(expression):
+    """Cached croniter for an expression, scoped to the calling thread"""
+    cache = getattr(_cron_local, 'cache', None)
+    if cache is None:
+        cache = _cron_local.cache = {}
+    cron = cache.get(expression)
+    if cron is None:
+        if len(cache) > 256:
+            cache.clear()
+        cron = cache[expression] = croniter(expression)
+    return cron
+
+@lru_cache(maxsize=2048)
+def _parse_iso(value):
+    """Parse an ISO-8601 string, memoized
+
+    The due checks re-parse the same last_run_at / scheduled_time
+    strings every tick until the task runs again; caching turns the
+    repeats into a dict hit. Tries fromisoformat directly first since
+    our own timestamps carry no Z suffix.
+    """
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
 
 class TaskScheduler:
     def __init__(self):
-        # Initialize Supabase client
-        supabase_url = os.getenv('SUPABASE_URL')
-        supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        
-        if not supabase_url or not supabase_key:
-            raise ValueError("Supabase credentials not configured")
-        
-        self.supabase: Client = create_client(supabase_url, supabase_key)
+        # Process-wide Supabase client - one PostgREST connection pool
+        # shared with the routes and services (raises ValueError if
+        # credentials are missing)
+        self.supabase: Client = get_supabase_client()
         self.running = False
         self.scheduler_thread = None
-        
-        # Initialize services
-        self.meetings_service = MeetingsImportService()
-        self.import_log_service = ImportLogService()
+
+        # Set to cut the loop's sleep short - wake() fires it when a
+        # task is created, rescheduled or manually run so changes take
+        # effect immediately instead of up to a minute later
+        self._wake_event = threading.Event()
+
+        # Bounded pool for task execution - due tasks run concurrently
+        # instead of serially blocking the loop (a slow import no
+        # longer delays every other due task), and manual run-now
+        # requests share the same cap
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='task')
+
+        # Shared service singletons - their API sessions and caches are
+        # reused across the scheduler and the request handlers
+        self.meetings_service = get_import_service()
+        self.import_log_service = get_log_service()
     
     def start(self):
         """Start the task scheduler"""
@@ -38,33 +87,98 @@ class TaskScheduler:
     def stop(self):
         """Stop the task scheduler"""
         self.running = False
+        self._wake_event.set()
         if self.scheduler_thread:
             self.scheduler_thread.join()
         print("Task scheduler stopped")
-    
+
+    def wake(self):
+        """Interrupt the loop's sleep so schedule changes apply now"""
+        self._wake_event.set()
+
+    def submit_task(self, task, already_marked=False):
+        """Run a task on the scheduler's pool (used by manual run-now)"""
+        return self._executor.submit(self._execute_task, task, already_marked=already_marked)
+
     def _scheduler_loop(self):
-        """Main scheduler loop"""
+        """Main scheduler loop
+
+        Sleeps until the next stored run time (capped at the old
+        60-second tick) instead of a fixed minute, and wakes early when
+        wake() fires - idle periods cost one query per minute at most
+        while due tasks still start on time.
+        """
         while self.running:
             try:
                 self._check_and_execute_tasks()
-                time.sleep(60)  # Check every minute
+                timeout = self._seconds_until_next_run()
             except Exception as e:
                 print(f"Scheduler error: {str(e)}")
-                time.sleep(60)
+                timeout = 60
+            self._wake_event.wait(timeout=timeout)
+            self._wake_event.clear()
+
+    def _seconds_until_next_run(self):
+        """How long the loop can sleep before the next task is due
+
+        Reads the smallest stored next_run_at for active tasks; clamped
+        to [1, 60] so a stale value can neither spin the loop nor stall
+        it for longer than the legacy tick.
+        """
+        try:
+            result = self.supabase.table('scheduled_tasks').select(
+                'next_run_at'
+            ).eq('is_active', True).not_.is_(
+                'next_run_at', 'null'
+            ).order('next_run_at').limit(1).execute()
+
+            if result.data:
+                next_run = _parse_iso(result.data[0]['next_run_at'])
+                delta = (next_run - datetime.now()).total_seconds()
+                return max(1, min(60, delta))
+        except Exception as e:
+            print(f"Error reading next run time: {e}")
+        return 60
     
     def _check_and_execute_tasks(self):
         """Check for tasks that need to be executed"""
         now = datetime.now()
         
-        # Get active tasks that are due to run
-        result = self.supabase.table('scheduled_tasks').select('*').eq('is_active', True).eq('is_running', False).execute()
+        # Get active tasks that are due to run - only the columns the
+        # due checks and executors actually read, not select('*').
+        # Filtering on the stored next_run_at lets the database answer
+        # "what is due" with an indexed scan (see
+        # sql/scheduled_tasks_next_run_index.sql) instead of shipping
+        # every active task down for Python to reject; the null arm
+        # keeps tasks whose next_run_at was never computed eligible.
+        result = self.supabase.table('scheduled_tasks').select(
+            'task_id, task_type, task_config, schedule_type, cron_expression, '
+            'interval_minutes, scheduled_time, last_run_at, is_running'
+        ).eq('is_active', True).eq('is_running', False).or_(
+            f'next_run_at.is.null,next_run_at.lte.{now.isoformat()}'
+        ).execute()
         
         if not result.data:
             return
         
-        for task in result.data:
-            if self._is_task_due(task, now):
-                self._execute_task(task)
+        # _is_task_due stays as a safety net over the SQL prefilter:
+        # next_run_at is denormalized, so a stale or hand-edited value
+        # can't fire a task that its schedule says isn't due
+        due_tasks = [task for task in result.data if self._is_task_due(task, now)]
+        if not due_tasks:
+            return
+
+        # One UPDATE marks the whole batch running instead of a write
+        # per task before each execution
+        self.supabase.table('scheduled_tasks').update({
+            'is_running': True,
+            'last_run_at': now.isoformat()
+        }, returning='minimal').in_(
+            'task_id', [task['task_id'] for task in due_tasks]
+        ).execute()
+
+        for task in due_tasks:
+            self._executor.submit(self._execute_task, task, already_marked=True)
     
     def _is_task_due(self, task, now):
         """Check if a task is due to run"""
@@ -86,14 +200,15 @@ class TaskScheduler:
             return False
         
         try:
-            cron = croniter(cron_expression, now)
+            cron = _get_croniter(cron_expression)
+            cron.set_current(now, force=True)
             next_run = cron.get_prev(datetime)
             last_run = task.get('last_run_at')
             
             if not last_run:
                 return True
             
-            last_run_dt = datetime.fromisoformat(last_run.replace('Z', '+00:00'))
+            last_run_dt = _parse_iso(last_run)
             return next_run > last_run_dt
         except Exception as e:
             print(f"Error checking cron schedule for task {task['task_id']}: {str(e)}")
@@ -109,7 +224,7 @@ class TaskScheduler:
         if not last_run:
             return True
         
-        last_run_dt = datetime.fromisoformat(last_run.replace('Z', '+00:00'))
+        last_run_dt = _parse_iso(last_run)
         next_run = last_run_dt + timedelta(minutes=interval_minutes)
         return now >= next_run
     
@@ -119,21 +234,27 @@ class TaskScheduler:
         if not scheduled_time:
             return False
         
-        scheduled_dt = datetime.fromisoformat(scheduled_time.replace('Z', '+00:00'))
+        scheduled_dt = _parse_iso(scheduled_time)
         return now >= scheduled_dt and not task.get('last_run_at')
     
-    def _execute_task(self, task):
-        """Execute a scheduled task"""
+    def _execute_task(self, task, already_marked=False):
+        """Execute a scheduled task
+
+        already_marked=True means the caller has already flipped
+        is_running (the loop does it for the whole due batch in one
+        UPDATE); manual run-now calls leave it False.
+        """
         task_id = task['task_id']
         task_type = task['task_type']
-        
+
         try:
             # Mark task as running
-            self.supabase.table('scheduled_tasks').update({
-                'is_running': True,
-                'last_run_at': datetime.now().isoformat()
-            }).eq('task_id', task_id).execute()
-            
+            if not already_marked:
+                self.supabase.table('scheduled_tasks').update({
+                    'is_running': True,
+                    'last_run_at': datetime.now().isoformat()
+                }, returning='minimal').eq('task_id', task_id).execute()
+
             # Execute based on task type
             if task_type == 'meetings_import':
                 self._execute_meetings_import(task)
@@ -143,12 +264,12 @@ class TaskScheduler:
                 raise Exception(f"Unknown task type: {task_type}")
             
             # Mark task as completed successfully
-            self._update_task_completion(task_id, 'success', 'Task completed successfully')
-            
+            self._update_task_completion(task, 'success', 'Task completed successfully')
+
         except Exception as e:
             error_message = str(e)
             print(f"Task execution failed for {task_id}: {error_message}")
-            self._update_task_completion(task_id, 'failed', error_message)
+            self._update_task_completion(task, 'failed', error_message)
     
     def _execute_meetings_import(self, task):
         """Execute meetings import task with automatic archiving"""
@@ -169,14 +290,27 @@ class TaskScheduler:
         )
         
         try:
-            # First, archive old meetings (enabled by default)
-            archive_count = 0
+            # Archive old meetings (enabled by default) concurrently
+            # with the import - the two touch disjoint rows (past dates
+            # vs the target date), so there's no reason to serialize
+            # them. _archive_old_meetings swallows its own errors and
+            # returns 0, so the future can't raise past the timeout.
+            archive_future = None
             if task_config.get('archive_old_meetings', True):
-                archive_count = self._archive_old_meetings()
-            
+                archive_future = _archive_pool.submit(self._archive_old_meetings)
+
             # Execute import
-            result = self.meetings_service.import_meetings_for_date(import_date)
-            
+            result = self.meetings_service.import_meetings_for_date(import_date, log_id=log_id)
+
+            # A slow archive must not fail a run whose import succeeded
+            # - archiving is housekeeping, so time it out and move on
+            archive_count = 0
+            if archive_future is not None:
+                try:
+                    archive_count = archive_future.result(timeout=60)
+                except FutureTimeoutError:
+                    print("Archiving old meetings still running after 60s; continuing without its count")
+
             # Update import log with combined results
             message = result.get('message', '')
             if archive_count > 0:
@@ -203,9 +337,9 @@ class TaskScheduler:
     def _archive_old_meetings(self):
         """Archive meetings older than today"""
         try:
-            from ..imports.meetings.meeting_status_service import MeetingStatusService
-            
-            status_service = MeetingStatusService()
+            from ..imports.meetings.meeting_status_service import get_service
+
+            status_service = get_service()
             result = status_service.archive_old_meetings()
             
             if result['success']:
@@ -244,28 +378,51 @@ class TaskScheduler:
             print(f"Error in ratings polling: {e}")
             raise
     
-    def _update_task_completion(self, task_id, status, message):
-        """Update task completion status"""
+    def _update_task_completion(self, task, status, message):
+        """Persist task completion in one round trip
+
+        The old path made four sequential calls per completion: a
+        counter-increment RPC, a success/failure increment RPC, a SELECT
+        to recompute the next run, then the UPDATE (and it stored the
+        RPC result objects into the counter columns). complete_task()
+        (sql/complete_task.sql) folds the counters and the status/next-
+        run write into one statement; next_run_at comes from the task
+        dict already in hand instead of a re-fetch.
+        """
+        task_id = task['task_id']
+        next_run = self._calculate_next_run(task)
+        next_run_at = next_run.isoformat() if next_run else None
+
+        try:
+            self.supabase.rpc('complete_task', {
+                'p_task_id': str(task_id),
+                'p_status': status,
+                'p_message': message,
+                'p_next_run_at': next_run_at
+            }).execute()
+            return
+        except Exception as rpc_error:
+            print(f"complete_task RPC unavailable, falling back to separate updates: {rpc_error}")
+
+        # Fallback: counters via the legacy increment functions, then one
+        # UPDATE for the status fields
+        try:
+            self.supabase.rpc('increment_total_runs', {'task_id': task_id}).execute()
+            if status == 'success':
+                self.supabase.rpc('increment_successful_runs', {'task_id': task_id}).execute()
+            else:
+                self.supabase.rpc('increment_failed_runs', {'task_id': task_id}).execute()
+        except Exception as e:
+            print(f"Error updating run counters for task {task_id}: {e}")
+
         update_data = {
             'is_running': False,
             'last_run_status': status,
-            'last_run_message': message,
-            'total_runs': self.supabase.rpc('increment_total_runs', {'task_id': task_id}).execute()
+            'last_run_message': message
         }
-        
-        if status == 'success':
-            update_data['successful_runs'] = self.supabase.rpc('increment_successful_runs', {'task_id': task_id}).execute()
-        else:
-            update_data['failed_runs'] = self.supabase.rpc('increment_failed_runs', {'task_id': task_id}).execute()
-        
-        # Calculate next run time for recurring tasks
-        task_result = self.supabase.table('scheduled_tasks').select('*').eq('task_id', task_id).execute()
-        if task_result.data:
-            task = task_result.data[0]
-            next_run = self._calculate_next_run(task)
-            if next_run:
-                update_data['next_run_at'] = next_run.isoformat()
-        
+        if next_run_at:
+            update_data['next_run_at'] = next_run_at
+
         self.supabase.table('scheduled_tasks').update(update_data).eq('task_id', task_id).execute()
     
     def _calculate_next_run(self, task):
@@ -276,7 +433,8 @@ class TaskScheduler:
             cron_expression = task.get('cron_expression')
             if cron_expression:
                 try:
-                    cron = croniter(cron_expression, datetime.now())
+                    cron = _get_croniter(cron_expression)
+                    cron.set_current(datetime.now(), force=True)
                     return cron.get_next(datetime)
                 except:
                     return None
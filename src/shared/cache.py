@@ -0,0 +1,15 @@
+from flask_caching import Cache
+
+# Shared cache instance - initialized against the app in src/main.py.
+# SimpleCache keeps everything in-process, which is fine for a single
+# admin instance; swap CACHE_TYPE for Redis if we ever run multiple workers.
+cache = Cache(config={'CACHE_TYPE': 'SimpleCache'})
+
+def invalidate_dashboard_cache():
+    """Clear cached dashboard/health responses after an import changes the data"""
+    try:
+        cache.delete('view//api/dashboard/stats')
+        cache.delete('view//api/system/health')
+    except Exception as e:
+        # Cache invalidation should never break the import pipeline
+        print(f"Failed to invalidate dashboard cache: {e}")
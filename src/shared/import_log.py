@@ -1,17 +1,30 @@
-import os
+import threading
+import time
 from datetime import datetime
-from supabase import create_client, Client
+from functools import lru_cache
+from supabase import Client
+from src.shared.query_budget import record_query
+from src.shared.supabase_client import get_supabase_client
 
 class ImportLogService:
+    # update_log_progress flushes its buffer when either threshold is
+    # crossed - at most ~2 writes/second per log however often an
+    # import loop reports
+    PROGRESS_FLUSH_INTERVAL = 0.5
+    PROGRESS_FLUSH_RECORDS = 1000
+
     def __init__(self):
-        # Initialize Supabase client
-        supabase_url = os.getenv('SUPABASE_URL')
-        supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        
-        if not supabase_url or not supabase_key:
-            raise ValueError("Supabase credentials not configured")
-        
-        self.supabase: Client = create_client(supabase_url, supabase_key)
+        # Process-wide Supabase client - one PostgREST connection pool
+        # shared with every other module (raises ValueError if
+        # credentials are missing)
+        self.supabase: Client = get_supabase_client()
+
+        # Write-behind buffer for incremental progress counters, keyed
+        # by log id: [processed, inserted, updated] deltas awaiting a
+        # flush, plus the monotonic time of each log's last flush
+        self._progress_lock = threading.Lock()
+        self._progress_pending = {}
+        self._progress_last_flush = {}
     
     def create_log(self, import_type, trigger_type, import_date=None, import_mode='production'):
         """Create a new import log entry"""
@@ -28,12 +41,61 @@ class ImportLogService:
             'created_at': datetime.now().isoformat()
         }
         
+        record_query()
         result = self.supabase.table('import_logs').insert(log_data).execute()
         return result.data[0]['id'] if result.data else None
     
-    def update_log(self, log_id, status=None, records_processed=0, records_inserted=0, 
+    def update_log_progress(self, log_id, records_processed=0, records_inserted=0,
+                            records_updated=0):
+        """Report incremental progress without a round trip per call
+
+        Deltas accumulate in memory and flush as one incremental UPDATE
+        via the increment_import_log() function
+        (sql/increment_import_log.sql) once PROGRESS_FLUSH_RECORDS
+        records or PROGRESS_FLUSH_INTERVAL seconds have built up -
+        import loops can report per chunk without turning the log into
+        a per-chunk write. The final update_log() call writes absolute
+        totals, so buffered (or dropped) deltas only ever affect the
+        in-flight progress display, never the completed record.
+        """
+        now = time.monotonic()
+        with self._progress_lock:
+            pending = self._progress_pending.setdefault(log_id, [0, 0, 0])
+            pending[0] += records_processed
+            pending[1] += records_inserted
+            pending[2] += records_updated
+
+            last_flush = self._progress_last_flush.setdefault(log_id, now)
+            if pending[0] < self.PROGRESS_FLUSH_RECORDS and now - last_flush < self.PROGRESS_FLUSH_INTERVAL:
+                return
+            deltas = self._progress_pending.pop(log_id)
+            self._progress_last_flush[log_id] = now
+
+        processed, inserted, updated = deltas
+        if not (processed or inserted or updated):
+            return
+        try:
+            record_query()
+            self.supabase.rpc('increment_import_log', {
+                'p_log_id': log_id,
+                'p_processed': processed,
+                'p_inserted': inserted,
+                'p_updated': updated
+            }).execute()
+        except Exception as e:
+            # Progress is cosmetic while the import runs; the final
+            # update_log() writes the authoritative totals
+            print(f"increment_import_log RPC unavailable, dropping buffered progress: {e}")
+
+    def update_log(self, log_id, status=None, records_processed=0, records_inserted=0,
                    records_updated=0, message=None, error_message=None):
         """Update an existing import log"""
+        # Discard any buffered progress for this log - the counters
+        # below are absolute totals and supersede pending deltas
+        with self._progress_lock:
+            self._progress_pending.pop(log_id, None)
+            self._progress_last_flush.pop(log_id, None)
+
         update_data = {
             'records_processed': records_processed,
             'records_inserted': records_inserted,
@@ -51,16 +113,103 @@ class ImportLogService:
         if error_message:
             update_data['error_message'] = error_message
         
-        result = self.supabase.table('import_logs').update(update_data).eq('id', log_id).execute()
-        return result.data[0] if result.data else None
+        # No caller reads the updated row back - return=minimal keeps the
+        # response to headers only instead of echoing the full row
+        record_query()
+        self.supabase.table('import_logs').update(update_data, returning='minimal').eq('id', log_id).execute()
     
-    def get_recent_logs(self, limit=10):
-        """Get recent import logs"""
-        result = self.supabase.table('import_logs').select('*').order('created_at', desc=True).limit(limit).execute()
+    def get_status_counts(self):
+        """Get import log counts by status without transferring any rows
+
+        Uses the import_log_status_counts() Postgres function so all three
+        counts come back in one HTTP round trip, with a fallback to
+        per-status HEAD count queries if the function isn't deployed yet.
+        """
+        try:
+            record_query()
+            result = self.supabase.rpc('import_log_status_counts').execute()
+            if result.data:
+                counts = result.data
+                return {
+                    'total': counts.get('total', 0),
+                    'completed': counts.get('completed', 0),
+                    'failed': counts.get('failed', 0)
+                }
+        except Exception as e:
+            print(f"import_log_status_counts RPC unavailable, falling back to count queries: {e}")
+
+        def _count(status=None):
+            query = self.supabase.table('import_logs').select('id', count='exact', head=True)
+            if status:
+                query = query.eq('status', status)
+            record_query()
+            result = query.execute()
+            return result.count or 0
+
+        return {
+            'total': _count(),
+            'completed': _count('completed'),
+            'failed': _count('failed')
+        }
+
+    def get_dashboard_snapshot(self):
+        """Get status counts plus recent activity in one round trip
+
+        Uses the dashboard_snapshot() Postgres function; falls back to
+        separate count and recent-logs queries if it isn't deployed.
+        """
+        try:
+            record_query()
+            result = self.supabase.rpc('dashboard_snapshot').execute()
+            if result.data:
+                return result.data
+        except Exception as e:
+            print(f"dashboard_snapshot RPC unavailable, falling back to separate queries: {e}")
+
+        counts = self.get_status_counts()
+        counts['recent'] = self.get_recent_logs(
+            limit=5,
+            columns='id, import_type, trigger_type, import_mode, status, import_date, '
+                    'started_at, completed_at, records_processed, records_inserted, records_updated'
+        )
+        return counts
+
+    def get_recent_logs(self, limit=10, columns='*', before=None):
+        """Get recent import logs, optionally projecting only needed columns
+
+        `before` is a keyset cursor (created_at of the last row already
+        seen) - filtering on it keeps deep pages O(limit) instead of the
+        OFFSET scan-and-discard pattern.
+        """
+        query = self.supabase.table('import_logs').select(columns).order('created_at', desc=True).limit(limit)
+        if before:
+            query = query.lt('created_at', before)
+        record_query()
+        result = query.execute()
         return result.data if result.data else []
     
     def get_last_import_status(self):
-        """Get the status of the last import"""
-        result = self.supabase.table('import_logs').select('*').order('created_at', desc=True).limit(1).execute()
+        """Get the status of the last import
+
+        Projects only the fields the status endpoint renders - error
+        messages can run long, but select('*') also dragged every other
+        column across the wire once per poll.
+        """
+        record_query()
+        result = self.supabase.table('import_logs').select(
+            'id, import_type, trigger_type, import_mode, status, import_date, '
+            'started_at, completed_at, records_processed, records_inserted, '
+            'records_updated, error_message'
+        ).order('created_at', desc=True).limit(1).execute()
         return result.data[0] if result.data else None
 
+
+
+@lru_cache(maxsize=1)
+def get_log_service() -> ImportLogService:
+    """Get the shared ImportLogService instance
+
+    One Supabase client per process instead of one per request - keeps
+    the PostgREST keep-alive connections warm.
+    """
+    return ImportLogService()
@@ -0,0 +1,16 @@
+import orjson
+from flask.json.provider import JSONProvider
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson
+
+    orjson serializes dicts, datetimes and UUIDs in C, so jsonify no
+    longer pays Python-level per-field encoding on hot endpoints like
+    the dashboard recent-activity list.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NAIVE_UTC).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
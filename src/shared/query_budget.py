@@ -0,0 +1,40 @@
+"""Per-request query budget counter
+
+DB access in this app goes over HTTP to Supabase rather than through a
+SQLAlchemy engine, so instead of cursor events the data services call
+record_query() for each round trip. The after-request hook logs any
+endpoint that blows its budget, which is how N+1 regressions surface
+before they become dashboard latency complaints.
+"""
+
+import os
+import time
+from flask import g, request
+
+# Round trips allowed per request before we complain
+QUERY_BUDGET = int(os.getenv('QUERY_BUDGET', '5'))
+
+def record_query():
+    """Count one DB round trip against the current request, if any"""
+    try:
+        g.query_count = getattr(g, 'query_count', 0) + 1
+    except RuntimeError:
+        # Outside a request context (scheduler thread etc.) - nothing to count
+        pass
+
+def init_query_budget(app):
+    """Register request hooks that log endpoints exceeding the budget"""
+
+    @app.before_request
+    def _start_query_counter():
+        g.query_count = 0
+        g.request_start = time.monotonic()
+
+    @app.after_request
+    def _check_query_budget(response):
+        count = getattr(g, 'query_count', 0)
+        if count > QUERY_BUDGET:
+            duration_ms = (time.monotonic() - getattr(g, 'request_start', time.monotonic())) * 1000
+            print(f"⚠️ Query budget exceeded: {request.endpoint} made {count} DB round trips "
+                  f"(budget {QUERY_BUDGET}) in {duration_ms:.0f}ms")
+        return response
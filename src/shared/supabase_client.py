@@ -0,0 +1,29 @@
+import os
+import threading
+from supabase import create_client, Client
+
+# Shared Supabase client - created once per process so the underlying
+# HTTP session (and its TCP/TLS connections) is reused across requests
+# instead of paying a fresh handshake every time.
+_supabase: Client = None
+_supabase_lock = threading.Lock()
+
+def get_supabase_client() -> Client:
+    """Get the shared Supabase client, creating it on first use
+
+    First use can race between the scheduler thread and request
+    handlers, so creation is serialized; every later call returns the
+    existing client without touching the lock.
+    """
+    global _supabase
+    if _supabase is None:
+        with _supabase_lock:
+            if _supabase is None:
+                supabase_url = os.getenv('SUPABASE_URL')
+                supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+
+                if not supabase_url or not supabase_key:
+                    raise ValueError("Supabase credentials not configured")
+
+                _supabase = create_client(supabase_url, supabase_key)
+    return _supabase